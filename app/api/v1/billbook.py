@@ -1,46 +1,245 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+import asyncio
+import hashlib
+import json
 import logging
-from app.schemas.bill_schemas import BillResponse, BillCheckRequest, BillCheckResponse
+import os
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.async_session import async_engine_started, get_async_db, get_async_engine
+from app.database.session import database_url, pool_stats
+from app.models import LegiscanBill
+from app.schemas.bill_schemas import (
+    BillResponse,
+    BillCheckRequest,
+    BillCheckResponse,
+    JobStatusResponse,
+    LegiscanBillInfo
+)
 from app.services.bill_service import BillService
+from app.services.job_service import JobService
 from app.services.session_service import SessionService
+from app.states import DEFAULT_STATE_CODE, StateAdapter, get_adapter
+from app.utils.bill_numbers import BillRange, normalize_bill_number, parse_bill_ranges
+from app.utils.bill_text_store import bill_text_store
+from app.utils.http_client import http_clients
+from app.utils.response_cache import response_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Shared response cache; a request with Cache-Control: no-cache bypasses it and refreshes the entry
+SCRAPE_CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", "300"))
+SCRAPE_CACHE_STALE_TTL = float(os.getenv("SCRAPE_CACHE_STALE_TTL", "1800"))
+CHECK_CACHE_TTL = float(os.getenv("CHECK_CACHE_TTL", "60"))
+CHECK_CACHE_STALE_TTL = float(os.getenv("CHECK_CACHE_STALE_TTL", "0"))
+
+def cache_key(endpoint: str, params: dict) -> str:
+    return f"{endpoint}:" + hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+def wants_refresh(request: Request) -> bool:
+    return "no-cache" in request.headers.get("cache-control", "")
+
+def require_database():
+    if not database_url():
+        raise HTTPException(status_code=503, detail="DATABASE_URL is not configured")
+
+def resolve_adapter(state_code: str) -> StateAdapter:
+    try:
+        return get_adapter(state_code)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/scrape-bills", response_model=List[BillResponse])
-async def scrape_bills() -> List[BillResponse]:
+async def scrape_bills(
+    request: Request,
+    response: Response,
+    stream: Optional[str] = None,
+    prefix: Optional[List[str]] = Query(None),
+    since: Optional[datetime] = None,
+    state_code: str = DEFAULT_STATE_CODE,
+    bills: Optional[str] = None
+):
+    """
+    Scrape bills from a state's bill listing (Iowa's billpacket by default). Filter
+    with one or more `prefix` values (HF, SF, HSB, SSB, ...), `bills`, a list of
+    bill numbers and ranges such as "HF1-HF250,SF3", and/or `since`, the time a
+    bill first appeared.
+
+    First-seen times are read from the billpacket snapshot that process_new_bills
+    keeps under the instance's local .cache directory. An instance that doesn't
+    run it (e.g. a web-only instance) has no snapshot and answers `since` with 400.
+
+    With `?stream=ndjson` or `Accept: application/x-ndjson`, bills are streamed
+    one JSON object per line as each fetch completes instead of being collected
+    into a single list. Streamed responses are not cached.
+    """
+    adapter = resolve_adapter(state_code)
     try:
-        return await BillService.scrape_bills()
+        bill_ranges = parse_bill_ranges(bills) if bills else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    since_ts = None
+    if since is not None:
+        since_ts = (since if since.tzinfo else since.replace(tzinfo=timezone.utc)).timestamp()
+        if adapter.snapshot.load() is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"`since` needs the {adapter.state_code} billpacket snapshot, which this instance doesn't have; "
+                       f"it is only written where process_new_bills runs"
+            )
+    if stream == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(stream_bills_ndjson(prefix, since_ts, adapter, bill_ranges), media_type=NDJSON_MEDIA_TYPE)
+    try:
+        async def scrape():
+            scraped = await BillService.scrape_bills(
+                prefixes=prefix, since=since_ts, adapter=adapter, bill_ranges=bill_ranges
+            )
+            return [bill.model_dump() for bill in scraped]
+
+        key = cache_key("scrape-bills", {
+            "state_code": adapter.state_code,
+            "prefix": sorted(p.upper() for p in prefix or []),
+            "bills": [str(bill_range) for bill_range in sorted(bill_ranges or [])],
+            "since": since_ts
+        })
+        scraped, cache_state = await response_cache.get_or_compute(
+            key, scrape, SCRAPE_CACHE_TTL, SCRAPE_CACHE_STALE_TTL, refresh=wants_refresh(request)
+        )
+        response.headers["X-Cache"] = cache_state.upper()
+        return scraped
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
+async def stream_bills_ndjson(prefixes: Optional[List[str]], since: Optional[float],
+                              adapter: Optional[StateAdapter] = None,
+                              bill_ranges: Optional[List[BillRange]] = None) -> AsyncIterator[str]:
+    try:
+        async for bill in BillService.iter_bills(
+            prefixes=prefixes, since=since, adapter=adapter, bill_ranges=bill_ranges
+        ):
+            yield bill.model_dump_json() + "\n"
+    except Exception as e:
+        # Headers are already sent, so report the failure as a final line
+        error_msg = f"Unexpected error: {str(e)}"
+        logger.error(error_msg)
+        yield json.dumps({"error": error_msg}) + "\n"
+
 @router.post("/check-bills", response_model=BillCheckResponse)
-async def check_bills(request: BillCheckRequest) -> BillCheckResponse:
+async def check_bills(request: BillCheckRequest, http_request: Request, response: Response) -> BillCheckResponse:
     try:
-        new_bills = await BillService.check_for_bills(
-            request.bill_numbers,
-            request.session_id,
-            request.state_code
+        async def check():
+            return await BillService.check_for_bills(
+                request.bill_numbers,
+                request.session_id,
+                request.state_code,
+                chunk_size=request.chunk_size,
+                max_in_flight=request.max_in_flight
+            )
+
+        key = cache_key("check-bills", {
+            "bill_numbers": sorted(request.bill_numbers),
+            "session_id": request.session_id,
+            "state_code": request.state_code
+        })
+        new_bills, cache_state = await response_cache.get_or_compute(
+            key, check, CHECK_CACHE_TTL, CHECK_CACHE_STALE_TTL, refresh=wants_refresh(http_request)
         )
+        response.headers["X-Cache"] = cache_state.upper()
         return BillCheckResponse(new_bill_numbers=new_bills)
     except Exception as e:
         error_msg = f"Error checking bills: {str(e)}"
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
 
-@router.post("/trigger-bill-processing")
-async def trigger_bill_processing():
+@router.post("/trigger-bill-processing", status_code=202, response_model=JobStatusResponse)
+async def trigger_bill_processing(full_resync: bool = False, state_code: str = DEFAULT_STATE_CODE) -> JobStatusResponse:
     """
-    Manually trigger the bill processing job
+    Manually trigger the bill processing job for one state. Set full_resync to
+    process every billpacket row instead of only rows that changed since the last run.
+
+    The run happens in the background; poll GET /jobs/{job_id} for progress. If a
+    run for the state is already queued or running, its job is returned with
+    deduplicated=true.
     """
+    adapter = resolve_adapter(state_code)
     try:
-        logger.info("Manual trigger of bill processing initiated")
-        await BillService.process_new_bills()
-        return {"status": "success", "message": "Bill processing completed"}
+        logger.info(f"Manual trigger of {adapter.state_code} bill processing initiated (full_resync={full_resync})")
+        job, _ = await JobService.start_bill_processing(full_resync=full_resync, adapter=adapter)
+        return job
     except Exception as e:
         error_msg = f"Error in manual bill processing: {str(e)}"
         logger.error(error_msg)
-        raise HTTPException(status_code=500, detail=error_msg)
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=error_msg)
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str) -> JobStatusResponse:
+    """
+    Status and progress of a background job, from whichever worker is running it
+    """
+    job = await JobService.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.get("/bill-updates")
+async def bill_updates(state_code: str = DEFAULT_STATE_CODE, session_id: Optional[int] = None,
+                       since: Optional[datetime] = None):
+    """
+    Bill text changes detected across scrapes, oldest first. Defaults to the
+    state's current session.
+    """
+    adapter = resolve_adapter(state_code)
+    state_code = adapter.state_code
+    if session_id is None:
+        session_id = adapter.resolve_session_id()
+    since_ts = None
+    if since is not None:
+        since_ts = (since if since.tzinfo else since.replace(tzinfo=timezone.utc)).timestamp()
+    return await asyncio.to_thread(bill_text_store.updates, state_code, session_id, since_ts)
+
+@router.post("/cache/invalidate")
+async def invalidate_cache(endpoint: Optional[str] = None):
+    """
+    Drop cached responses for one endpoint (scrape-bills or check-bills), or all of them
+    """
+    invalidated = await asyncio.to_thread(response_cache.invalidate, f"{endpoint}:" if endpoint else "")
+    logger.info(f"Invalidated {invalidated} cached responses ({endpoint or 'all endpoints'})")
+    return {"status": "success", "invalidated": invalidated}
+
+@router.get("/http-pool-stats")
+async def http_pool_stats():
+    """
+    Connection pool stats for this worker's pooled upstream HTTP sessions
+    """
+    return http_clients.stats()
+
+@router.get("/bills/{bill_number}", response_model=List[LegiscanBillInfo], dependencies=[Depends(require_database)])
+async def get_bill_info(bill_number: str, state_code: str = DEFAULT_STATE_CODE,
+                        db: AsyncSession = Depends(get_async_db)):
+    """
+    Bills in the database with this bill number (case-insensitive) for a state
+    """
+    result = await db.execute(
+        select(LegiscanBill).where(
+            LegiscanBill.readable_bill_number.ilike(normalize_bill_number(bill_number)),
+            LegiscanBill.state_code == state_code.upper()
+        )
+    )
+    return result.scalars().all()
+
+@router.get("/db-pool-stats")
+async def db_pool_stats():
+    """
+    Connection pool stats for this worker's async database engine
+    """
+    if not async_engine_started():
+        return {"started": False}
+    return {"started": True, **pool_stats(get_async_engine().sync_engine)}
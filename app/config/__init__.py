@@ -0,0 +1,37 @@
+import json
+import os
+
+# Timezone the bill processing windows are expressed in
+SCHEDULE_TIMEZONE = os.getenv("SCHEDULE_TIMEZONE", "US/Central")
+
+# Cron windows (APScheduler cron fields) during which the clock process polls the
+# billpacket. Override with a JSON list of the same shape in BILL_PROCESSING_WINDOWS.
+DEFAULT_BILL_PROCESSING_WINDOWS = [
+    # Morning window part 1 (7:30 AM - 7:59 AM)
+    {"day_of_week": "mon-thu", "hour": "7", "minute": "30-59/10"},
+    # Morning window part 2 (8:00 AM - 11:00 AM)
+    {"day_of_week": "mon-thu", "hour": "8-10", "minute": "*/10"},
+    # Early afternoon window (12:00 PM - 3:00 PM)
+    {"day_of_week": "mon-thu", "hour": "12-14", "minute": "*/10"},
+    # Late afternoon window (4:00 PM - 6:00 PM)
+    {"day_of_week": "mon-thu", "hour": "16-18", "minute": "*/10"},
+]
+
+BILL_PROCESSING_WINDOWS = (
+    json.loads(os.environ["BILL_PROCESSING_WINDOWS"])
+    if os.getenv("BILL_PROCESSING_WINDOWS")
+    else DEFAULT_BILL_PROCESSING_WINDOWS
+)
+
+# Adaptive polling: inside the windows above, poll every POLL_MIN_INTERVAL_MINUTES
+# while the billpacket is changing and back off towards POLL_MAX_INTERVAL_MINUTES
+# when it is static. Set ADAPTIVE_POLLING=false to poll on the fixed cron windows.
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "true").lower() == "true"
+POLL_MIN_INTERVAL_MINUTES = float(os.getenv("POLL_MIN_INTERVAL_MINUTES", "2"))
+POLL_MAX_INTERVAL_MINUTES = float(os.getenv("POLL_MAX_INTERVAL_MINUTES", "10"))
+POLL_BURST_WINDOW_MINUTES = float(os.getenv("POLL_BURST_WINDOW_MINUTES", "15"))
+
+# States processed by the clock, as comma separated codes with an adapter in app.states,
+# and how many of them run at the same time
+ENABLED_STATES = [code.strip().upper() for code in os.getenv("ENABLED_STATES", "IA").split(",") if code.strip()]
+STATE_MAX_CONCURRENCY = int(os.getenv("STATE_MAX_CONCURRENCY", "4"))
@@ -0,0 +1,111 @@
+import logging
+from typing import AsyncIterator, Optional, Tuple
+
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database.session import (
+    API_DB_MAX_OVERFLOW,
+    API_DB_POOL_SIZE,
+    DB_POOL_RECYCLE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS,
+    check_connection_budget,
+    database_url,
+    track_pool
+)
+
+logger = logging.getLogger(__name__)
+
+# Each uvicorn worker has its own pool, sized from the connection budget in app.database.session
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[async_sessionmaker] = None
+
+
+def async_database_url() -> Tuple[URL, dict]:
+    """
+    DATABASE_URL with its async driver (asyncpg, or aiosqlite for a SQLite stand-in),
+    plus the connect args asyncpg needs in place of libpq URL options.
+    """
+    url = database_url()
+    if not url:
+        raise RuntimeError("DATABASE_URL is not set")
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend}")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    connect_args = {}
+    if backend == "postgresql":
+        # asyncpg doesn't understand libpq's sslmode
+        sslmode = url.query.get("sslmode")
+        if sslmode:
+            connect_args["ssl"] = sslmode
+            url = url.difference_update_query(["sslmode"])
+        if DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+    return url, connect_args
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    This worker's async engine for API requests, created on first use so the
+    pool belongs to the worker's event loop.
+    """
+    global _engine
+    if _engine is None:
+        url, connect_args = async_database_url()
+        if url.get_backend_name() == "sqlite":
+            _engine = create_async_engine(url, connect_args=connect_args)
+        else:
+            _engine = create_async_engine(
+                url,
+                pool_size=API_DB_POOL_SIZE,
+                max_overflow=API_DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                connect_args=connect_args
+            )
+            check_connection_budget()
+        track_pool(_engine.sync_engine)
+        logger.info(
+            f"Created async database engine for {_engine.url.render_as_string(hide_password=True)} "
+            f"(pool size {API_DB_POOL_SIZE}, overflow {API_DB_MAX_OVERFLOW})"
+        )
+    return _engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = async_sessionmaker(get_async_engine(), expire_on_commit=False)
+    return _session_factory
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency: an AsyncSession for the request, rolled back on error and
+    closed afterwards. Scripts and other sync code use app.database.session.get_db.
+    """
+    async with get_async_session_factory()() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def async_engine_started() -> bool:
+    return _engine is not None
+
+
+async def dispose_async_engine():
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+    _session_factory = None
@@ -0,0 +1,153 @@
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import BigInteger, create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+from dotenv import load_dotenv
+
+from app.config import ENABLED_STATES
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# One connection budget for the whole app. DB_MAX_CONNECTIONS (the plan's limit) is split evenly
+# between the uvicorn workers (WEB_CONCURRENCY, 4 in the Procfile) and the clock process. Each
+# process keeps DB_LOCK_CONNECTIONS of its share for SingleFlight advisory locks, which hold a
+# connection of their own per running state, and splits the rest between its sync pool (bulk
+# ingest, scripts) and, in web workers, the async API pool (app.database.async_session)
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "4"))
+DB_PROCESS_CONNECTIONS = max(1, DB_MAX_CONNECTIONS // (WEB_CONCURRENCY + 1))
+DB_LOCK_CONNECTIONS = int(os.getenv("DB_LOCK_CONNECTIONS", "0")) or len(ENABLED_STATES)
+DB_POOL_CONNECTIONS = max(2, DB_PROCESS_CONNECTIONS - DB_LOCK_CONNECTIONS)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "0")) or max(1, DB_POOL_CONNECTIONS // 2)
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "0"))
+API_DB_POOL_SIZE = int(os.getenv("API_DB_POOL_SIZE", "0")) or max(1, DB_POOL_CONNECTIONS - DB_POOL_SIZE)
+API_DB_MAX_OVERFLOW = int(os.getenv("API_DB_MAX_OVERFLOW", "0"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle before Heroku Postgres / pgbouncer drop idle server connections
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Postgres statement_timeout for every connection, in milliseconds (0 disables it)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+
+
+@compiles(BigInteger, "sqlite")
+def _compile_big_integer_sqlite(type_, compiler, **kw):
+    # Only INTEGER PRIMARY KEY autoincrements in SQLite, so the models' BigInteger ids
+    # need to be INTEGER for a local SQLite stand-in database
+    return "INTEGER"
+
+
+def database_url() -> Optional[str]:
+    url = os.getenv("DATABASE_URL")
+    if url and url.startswith("postgres://"):
+        # Heroku still hands out the scheme SQLAlchemy dropped
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def check_connection_budget():
+    """
+    Warn when pool settings overridden in the environment let the processes
+    together open more connections than DB_MAX_CONNECTIONS.
+    """
+    per_process = DB_POOL_SIZE + DB_MAX_OVERFLOW + API_DB_POOL_SIZE + API_DB_MAX_OVERFLOW + DB_LOCK_CONNECTIONS
+    total = per_process * (WEB_CONCURRENCY + 1)
+    if total > DB_MAX_CONNECTIONS:
+        logger.warning(
+            f"Database pools allow up to {total} connections ({per_process} in each of {WEB_CONCURRENCY} web "
+            f"workers and the clock), more than DB_MAX_CONNECTIONS={DB_MAX_CONNECTIONS}"
+        )
+
+
+def track_pool(engine: Engine) -> Engine:
+    """
+    Count connects, checkouts and invalidations on an engine's pool for pool_stats
+    """
+    counters = engine.pool_counters = Counter()
+    for name in ("connect", "checkout", "invalidate"):
+        event.listen(engine, name, lambda *args, name=name: counters.update([name]))
+    return engine
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool = engine.pool
+    counters = getattr(engine, "pool_counters", Counter())
+    stats = {"pool": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    stats.update(
+        connects=counters["connect"], checkouts=counters["checkout"], invalidations=counters["invalidate"]
+    )
+    return stats
+
+
+def get_engine() -> Engine:
+    """
+    Process-wide pooled engine for DATABASE_URL, created on first use. A
+    sqlite:/// URL works as a local stand-in for Postgres.
+    """
+    global _engine
+    if _engine is None:
+        url = database_url()
+        if not url:
+            raise RuntimeError("DATABASE_URL is not set")
+        if url.startswith("sqlite"):
+            _engine = create_engine(url)
+        else:
+            _engine = create_engine(
+                url,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                connect_args={"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+            )
+            check_connection_budget()
+        track_pool(_engine)
+        logger.info(
+            f"Created database engine for {_engine.url.render_as_string(hide_password=True)} "
+            f"(pool size {DB_POOL_SIZE}, overflow {DB_MAX_OVERFLOW})"
+        )
+    return _engine
+
+
+def get_session_factory() -> sessionmaker:
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(bind=get_engine(), expire_on_commit=False)
+    return _session_factory
+
+
+@contextmanager
+def get_db() -> Iterator[Session]:
+    """
+    Session on the pooled engine; rolled back if the block raises, always closed.
+    """
+    session = get_session_factory()()
+    try:
+        yield session
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def dispose_engine():
+    global _engine, _session_factory
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    _session_factory = None
@@ -1,13 +1,39 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import date
+import base64
+import hashlib
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+from typing import List, Literal, Optional
+from datetime import date, datetime
 
 class BillResponse(BaseModel):
+    """
+    A scraped bill. The attachment HTML is kept as the raw response bytes;
+    base64_html is only produced when the model is serialized. Input may carry
+    either `html` or `base64_html`.
+    """
     bill_number: str
     bill_title: Optional[str] = None
-    base64_html: str
+    html: bytes = Field(exclude=True, repr=False)
+    content_hash: str = ""
     state_link: str
 
+    @model_validator(mode="before")
+    @classmethod
+    def _decode_base64_html(cls, data):
+        if isinstance(data, dict) and "html" not in data and "base64_html" in data:
+            data = {**data, "html": base64.b64decode(data["base64_html"])}
+        return data
+
+    @model_validator(mode="after")
+    def _hash_html(self):
+        if not self.content_hash:
+            self.content_hash = hashlib.sha256(self.html).hexdigest()
+        return self
+
+    @computed_field
+    @property
+    def base64_html(self) -> str:
+        return base64.b64encode(self.html).decode("ascii")
+
 class ManualBillEntry(BaseModel):
     state_code: str
     bill_number: str
@@ -20,6 +46,82 @@ class BillCheckRequest(BaseModel):
     bill_numbers: List[str]
     session_id: int
     state_code: str
+    chunk_size: Optional[int] = None
+    max_in_flight: Optional[int] = None
+
+class BillSubmissionResult(BaseModel):
+    bill_number: str
+    status: Literal["submitted", "already_exists", "failed"]
+    attempts: int
+    http_status: Optional[int] = None
+    error: Optional[str] = None
+
+class BillVersionUpdate(BaseModel):
+    bill_number: str
+    update_type: Literal["text_changed"] = "text_changed"
+    previous_version: int
+    version: int
+    previous_text_hash: Optional[str] = None
+    text_hash: str
+    content_hash: str
+
+class BillMarkdownResult(BaseModel):
+    bill_number: str
+    content_hash: str
+    markdown_text: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+class BillProcessingSummary(BaseModel):
+    total_bills: int
+    candidate_bills: int
+    fetched_bills: int
+    submitted_bills: List[str]
+    failed_bills: List[str]
+    unpublished_bills: List[str] = []
+    billpacket_changed: bool
+    submissions: List[BillSubmissionResult] = []
+    text_updates: List[BillVersionUpdate] = []
+    ingested_bills: int = 0
+
+class BillIngestResult(BaseModel):
+    bills: int = 0
+    texts: int = 0
+    statements: int = 0
+
+class BillProcessingProgress(BaseModel):
+    step: str = "queued"
+    total_bills: int = 0
+    candidate_bills: int = 0
+    fetched_bills: int = 0
+    checked_bills: int = 0
+    submitted_bills: int = 0
+    failed_bills: int = 0
+    errors: List[str] = []
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: Literal["queued", "running", "completed", "failed", "lost"]
+    created_at: float
+    updated_at: float
+    deduplicated: bool = False
+    progress: Optional[BillProcessingProgress] = None
+    result: Optional[BillProcessingSummary] = None
+    error: Optional[str] = None
 
 class BillCheckResponse(BaseModel):
-    new_bill_numbers: List[str]
\ No newline at end of file
+    new_bill_numbers: List[str]
+
+class LegiscanBillInfo(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    state_code: Optional[str] = None
+    legiscan_session_id: Optional[int] = None
+    readable_bill_number: Optional[str] = None
+    current_title: Optional[str] = None
+    current_state_link: Optional[str] = None
+    has_bill_text: Optional[bool] = None
+    entry_source: Optional[str] = None
+    updated_at: datetime
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark for the billpacket table parser.
+
+Compares the original full-page html.parser walk with the SoupStrainer and lxml
+parsers on saved billpacket pages, and checks that every parser produces the
+same rows as the original one. Without arguments a synthetic page is generated.
+
+    python -m app.scripts.bench_billpacket_parser saved_billpacket.html
+    python -m app.scripts.bench_billpacket_parser --rows 600 --repeat 20
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from app.utils import billpacket_parser
+from app.utils.billpacket_parser import parse_billpacket_soup
+
+
+def synthetic_page(rows: int) -> str:
+    filler = "<div class='nav'>" + "<a href='#'>link</a>" * 200 + "</div>"
+    bills = "".join(
+        f"<tr><td><a href='/BillBook?ba=HF{i}'>HF {i}</a></td>"
+        f"<td>A bill for an act relating to item {i}, <i>and</i> making penalties applicable.</td>"
+        f"<td>Committee {i % 12}</td></tr>"
+        for i in range(1, rows + 1)
+    )
+    study = "".join(
+        f"<tr><td><a href='/BillBook?ba=HSB{i}'>HSB {i}</a></td><td>Study bill {i}</td></tr>"
+        for i in range(1, rows // 4 + 1)
+    )
+    return (
+        f"<html><head><title>Bill Packet</title></head><body>{filler}"
+        f"<table class='standard sortable divideVert'><tr><th>Bill</th><th>Title</th></tr>{bills}</table>"
+        f"{filler}<table class='standard sortable divideVert'><tr><th>Bill</th><th>Title</th></tr>{study}</table>"
+        f"{filler}</body></html>"
+    )
+
+
+def measure(parse, content: str, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = parse(content)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    parse(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark billpacket parsers")
+    parser.add_argument("pages", nargs="*", help="Saved billpacket HTML pages")
+    parser.add_argument("--rows", type=int, default=400, help="Rows in the synthetic page when no pages are given")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((path, f.read()))
+    if not pages:
+        pages.append((f"synthetic ({args.rows} rows)", synthetic_page(args.rows)))
+
+    parsers = [
+        ("html.parser (full page)", lambda content: parse_billpacket_soup(content, restrict=False)),
+        ("html.parser + SoupStrainer", parse_billpacket_soup),
+    ]
+    if billpacket_parser.lxml is not None:
+        parsers.append(("lxml", billpacket_parser.parse_billpacket_lxml))
+    else:
+        print("lxml is not installed, skipping lxml parser")
+
+    mismatches = 0
+    for name, content in pages:
+        print(f"\n{name}: {len(content) / 1024:.0f} KiB")
+        baseline_rows = None
+        baseline_time = None
+        for label, parse in parsers:
+            rows, elapsed, peak = measure(parse, content, args.repeat)
+            if baseline_rows is None:
+                baseline_rows, baseline_time = rows, elapsed
+            same = rows == baseline_rows
+            mismatches += not same
+            print(
+                f"  {label:<28} {elapsed * 1000:8.2f} ms  peak {peak / 1024:8.0f} KiB  "
+                f"x{baseline_time / elapsed:5.1f}  rows={len(rows)}  {'OK' if same else 'MISMATCH'}"
+            )
+
+    if mismatches:
+        print(f"\n{mismatches} parser outputs differ from the original parser")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
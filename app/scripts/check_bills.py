@@ -1,6 +1,7 @@
 import asyncio
 import logging
 from app.services.bill_service import BillService
+from app.utils.http_client import http_clients
 import os
 
 logging.basicConfig(level=logging.INFO)
@@ -37,5 +38,9 @@ async def check_bill_existence():
         logger.error(f"Error during bill check: {str(e)}")
         logger.error(f"Error details: {type(e).__name__}: {str(e)}")
 
+async def main():
+    async with http_clients.lifespan():
+        await check_bill_existence()
+
 if __name__ == "__main__":
-    asyncio.run(check_bill_existence())
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Golden-file comparison of the local HTML-to-markdown converter with the bill
+formatter service.
+
+Record formatter outputs for some bills (needs BILL_FORMATTER_API_BASE_URL and
+access to legis.iowa.gov), then compare the local converter against them:
+
+    python -m app.scripts.compare_markdown_golden record HF1 SF2 HSB10
+    python -m app.scripts.compare_markdown_golden compare
+
+Each bill is stored as <bill>.html with the expected markdown in <bill>.md.
+compare exits non-zero if any local conversion differs from its golden file.
+
+The files checked into tests/fixtures/markdown (the default directory) were
+written by hand, not recorded, so passing on them pins the local converter's
+behaviour but says nothing about parity with the formatter. Record real
+formatter output into another --dir for that.
+"""
+import argparse
+import asyncio
+import difflib
+import glob
+import os
+import sys
+import time
+
+from app.services.bill_service import BillService
+from app.schemas.bill_schemas import BillResponse
+from app.states import get_adapter
+from app.utils.http_client import http_clients
+from app.utils.markdown_converter import convert_bill_html
+
+GOLDEN_DIR = os.path.join("tests", "fixtures", "markdown")
+
+
+async def record(bill_numbers, directory: str):
+    endpoint = BillService.formatter_convert_endpoint()
+    if endpoint is None:
+        print("BILL_FORMATTER_API_BASE_URL is not set")
+        sys.exit(2)
+    os.makedirs(directory, exist_ok=True)
+    async with http_clients.lifespan():
+        adapter = get_adapter()
+        scrape_session = adapter.http_session(adapter.attachment_url(bill_numbers[0]))
+        formatter_session = http_clients.get_session(endpoint)
+        for bill_number in bill_numbers:
+            html = await BillService.fetch_bill_html(scrape_session, bill_number)
+            if not html:
+                print(f"{bill_number}: no HTML, skipped")
+                continue
+            bill = BillResponse(bill_number=bill_number, html=html, state_link="")
+            markdown_text = await BillService.request_markdown(formatter_session, endpoint, bill)
+            with open(os.path.join(directory, f"{bill_number}.html"), "wb") as f:
+                f.write(html)
+            with open(os.path.join(directory, f"{bill_number}.md"), "w", encoding="utf-8") as f:
+                f.write(markdown_text)
+            print(f"{bill_number}: recorded {len(html) / 1024:.0f} KiB HTML, {len(markdown_text)} chars markdown")
+
+
+def normalize(text: str) -> list:
+    return [line.rstrip() for line in text.strip().splitlines()]
+
+
+def compare(directory: str, context: int) -> int:
+    html_paths = sorted(glob.glob(os.path.join(directory, "*.html")))
+    if not html_paths:
+        print(f"No golden files in {directory}")
+        return 2
+    mismatches = 0
+    for html_path in html_paths:
+        name = os.path.splitext(os.path.basename(html_path))[0]
+        golden_path = os.path.join(directory, f"{name}.md")
+        if not os.path.exists(golden_path):
+            print(f"{name}: no golden markdown, skipped")
+            continue
+        with open(html_path, "rb") as f:
+            html = f.read()
+        with open(golden_path, "r", encoding="utf-8") as f:
+            expected = normalize(f.read())
+        start = time.perf_counter()
+        actual = normalize(convert_bill_html(html))
+        elapsed = time.perf_counter() - start
+        ratio = difflib.SequenceMatcher(None, expected, actual).ratio()
+        same = actual == expected
+        mismatches += not same
+        print(f"{name:<10} {elapsed * 1000:8.2f} ms  similarity {ratio:6.1%}  {'OK' if same else 'MISMATCH'}")
+        if not same and context >= 0:
+            diff = difflib.unified_diff(expected, actual, "golden", "local", n=context, lineterm="")
+            for line in list(diff)[:80]:
+                print(f"    {line}")
+    if mismatches:
+        print(f"\n{mismatches} local conversions differ from the golden markdown")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the local markdown converter with golden markdown files")
+    parser.add_argument("command", choices=["record", "compare"])
+    parser.add_argument("bills", nargs="*", help="Bill numbers to record")
+    parser.add_argument("--dir", default=GOLDEN_DIR)
+    parser.add_argument("--context", type=int, default=2, help="Diff context lines, -1 to hide diffs")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        if not args.bills:
+            parser.error("record needs at least one bill number")
+        asyncio.run(record(args.bills, args.dir))
+        return
+    sys.exit(compare(args.dir, args.context))
+
+
+if __name__ == "__main__":
+    main()
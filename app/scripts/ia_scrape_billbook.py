@@ -1,9 +1,15 @@
-import requests
-from bs4 import BeautifulSoup
-import time
-import json
+import asyncio
 import os
-import base64
+from app.services.bill_service import BillService
+from app.utils.bill_text import text_hash
+from app.utils.bill_text_store import bill_text_store
+from app.utils.http_client import http_clients
+
+STATE_CODE = "IA"
+SESSION_ID = 937
+
+# The formatter this script has always used, unless the environment points elsewhere
+os.environ.setdefault("BILL_FORMATTER_API_BASE_URL", "https://html-processor-a2023f193a99.herokuapp.com")
 
 """
 TODO:
@@ -13,99 +19,48 @@ TODO:
 - Hit the new manual_bill_entry endpoint with the data
 """
 
-def get_bill_html(bill_number):
-    url = f"https://www.legis.iowa.gov/docs/publications/LGI/91/attachments/{bill_number}.html?layout=false"
-    
-    headers = {
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Connection': 'keep-alive',
-        'Referer': f'https://www.legis.iowa.gov/legislation/BillBook?ba={bill_number}&ga=91',
-        'Sec-Fetch-Dest': 'iframe',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'same-origin',
-        'Upgrade-Insecure-Requests': '1',
-        'User-Agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Mobile Safari/537.36',
-        'sec-ch-ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
-        'sec-ch-ua-mobile': '?1',
-        'sec-ch-ua-platform': '"Android"'
-    }
-    
+async def scrape_bills():
     try:
-        response = requests.get(url, headers=headers)
-        
-        if response.status_code == 404:
-            print(f"Bill {bill_number} not found (404)")
-            return None
-            
-        response.raise_for_status()
-        
-        if len(response.text) < 50:
-            print(f"Bill {bill_number} returned empty or invalid content")
-            return None
-            
-        return response.text
-        
-    except requests.RequestException as e:
-        print(f"Error fetching bill {bill_number}: {e}")
-        return None
-    
-def convert_to_base64(html_content):
-    return base64.b64encode(html_content.encode()).decode('utf-8')
+        # Fetch every attachment, keeping only bills whose text changed since the last markdown conversion
+        to_convert = {}
+        async for bill in BillService.iter_bills():
+            print(f"Fetched bill: {bill.bill_number}")
+            html_version = bill_text_store.put(
+                STATE_CODE, SESSION_ID, bill.bill_number, bill.html, kind="html", text_hash=text_hash(bill.html)
+            )
+            stored_text = bill_text_store.get(STATE_CODE, SESSION_ID, bill.bill_number, kind="markdown")
+            if stored_text and stored_text.version == html_version.version:
+                print(f"Bill {bill.bill_number} unchanged since version {html_version.version}, skipping conversion")
+                continue
+            to_convert[bill.bill_number] = (bill, html_version.version)
 
-def convert_to_markdown(html_content):
-    try:
-        response = requests.post(
-            "https://html-processor-a2023f193a99.herokuapp.com/api/v1/bill-text/convert",
-            json={"html_content_base64": html_content},
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-        return response.json()["text"]
-    except requests.RequestException as e:
-        print(f"Error converting HTML to markdown: {e}")
-        return None
+        print(f"Converting {len(to_convert)} bills to markdown")
+        bills = [bill for bill, _ in to_convert.values()]
+        async for result in BillService.convert_bills_to_markdown(bills):
+            version = to_convert[result.bill_number][1]
+            if result.markdown_text is None:
+                print(f"Failed to convert bill {result.bill_number} to markdown: {result.error}")
+                continue
+            # Index the markdown under the same version as the HTML it was converted from
+            bill_text_store.put(
+                STATE_CODE, SESSION_ID, result.bill_number, result.markdown_text.encode("utf-8"),
+                kind="markdown", version=version
+            )
+            print(f"Saved bill {result.bill_number} text (version {version})")
 
-def scrape_bills():
-    os.makedirs("bills", exist_ok=True)
-    
-    url = "https://www.legis.iowa.gov/legislation/billTracking/billpacket"
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        bill_table = soup.find('table', class_='standard sortable divideVert')
-        
-        if bill_table:
-            bill_links = bill_table.find_all('a')
-            for link in bill_links:
-                bill_number = link.text.strip().replace(" ", "")
-                print(f"Fetching bill: {bill_number}")
-                
-                bill_html = get_bill_html(bill_number)
-                if bill_html:
-                    base64_html = convert_to_base64(bill_html)
-                    markdown_text = convert_to_markdown(base64_html)
-                    if markdown_text:
-                        with open(f"bills/{bill_number}.txt", "w", encoding="utf-8") as f:
-                            f.write(markdown_text)
-                        print(f"Saved bill {bill_number} text")
-                    else:
-                        print(f"Failed to convert bill {bill_number} to markdown")
-                time.sleep(1)
-                
-    except requests.RequestException as e:
-        print(f"An error occurred while fetching the page: {e}")
+    except Exception as e:
+        print(f"An error occurred while scraping bills: {e}")
+
+async def run():
+    async with http_clients.lifespan():
+        while True:
+            print("Scraping bills:")
+            await scrape_bills()
+            print("\nWaiting for 15 minutes before next scrape...")
+            await asyncio.sleep(900)  # Wait for 15 minutes
 
 def main():
-    while True:
-        print("Scraping bills:")
-        scrape_bills()
-        print("\nWaiting for 15 minutes before next scrape...")
-        time.sleep(900)  # Wait for 15 minutes
+    asyncio.run(run())
 
 if __name__ == "__main__":
     main()
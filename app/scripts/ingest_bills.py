@@ -0,0 +1,68 @@
+"""
+Scrape a state's bills and bulk upsert them into DATABASE_URL.
+
+    DATABASE_URL=postgresql://... python -m app.scripts.ingest_bills
+    DATABASE_URL=sqlite:///.cache/standin.sqlite3 python -m app.scripts.ingest_bills --create-tables
+
+--create-tables creates the legiscan_sessions, legiscan_bills and
+legiscan_bill_texts tables from app.models first, for a local stand-in database.
+--create-indexes only creates the unique indexes the upserts need, for a
+database whose migrations don't have them yet; without it they must exist.
+"""
+import argparse
+import asyncio
+import time
+
+from app.database.session import get_engine
+from app.models import Base, LegiscanBill, LegiscanBillText, LegiscanSession
+from app.schemas.bill_schemas import BillIngestResult
+from app.services.bill_service import BillService
+from app.services.ingest_service import DB_INGEST_BATCH_SIZE, BillIngestService
+from app.states import DEFAULT_STATE_CODE, get_adapter
+from app.utils.http_client import http_clients
+
+
+async def ingest(state_code: str, batch_size: int) -> BillIngestResult:
+    adapter = get_adapter(state_code)
+    session_id = adapter.resolve_session_id()
+    total = BillIngestResult()
+    batch = []
+
+    async def flush():
+        result = await BillIngestService.ingest_bills_async(batch[:], adapter.state_code, session_id, batch_size)
+        batch.clear()
+        total.bills += result.bills
+        total.texts += result.texts
+        total.statements += result.statements
+
+    async with http_clients.lifespan():
+        async for bill in BillService.iter_bills(adapter=adapter):
+            batch.append(bill)
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape bills and bulk upsert them into the database")
+    parser.add_argument("--state", default=DEFAULT_STATE_CODE)
+    parser.add_argument("--batch-size", type=int, default=DB_INGEST_BATCH_SIZE)
+    parser.add_argument("--create-tables", action="store_true", help="Create the tables first (local stand-in)")
+    parser.add_argument("--create-indexes", action="store_true", help="Create the upserts' unique indexes first")
+    args = parser.parse_args()
+
+    if args.create_tables:
+        tables = [LegiscanSession.__table__, LegiscanBill.__table__, LegiscanBillText.__table__]
+        Base.metadata.create_all(get_engine(), tables=tables)
+    if args.create_tables or args.create_indexes:
+        BillIngestService.ensure_indexes(create=True)
+    start = time.perf_counter()
+    result = asyncio.run(ingest(args.state, args.batch_size))
+    print(f"Upserted {result.bills} bills and {result.texts} texts in {result.statements} statements "
+          f"({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
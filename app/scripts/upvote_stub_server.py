@@ -0,0 +1,111 @@
+"""
+Local stand-in for the Upvote API endpoints used by the bill scraper, plus the
+bill formatter's /api/v1/bill-text/convert endpoint.
+
+Run it and point the scraper at it:
+    python -m app.scripts.upvote_stub_server --port 8081 --seed HF1,HF2
+    UPVOTE_API_BASE_URL=http://127.0.0.1:8081 python -m app.scripts.check_bills
+    BILL_FORMATTER_API_BASE_URL=http://127.0.0.1:8081 python -m app.scripts.ia_scrape_billbook
+
+Bills are kept in memory per (state_code, session_id); the filter endpoint pages
+its results when given page and per_page. Use --no-batch to simulate an API
+without the batch existence endpoint, and --convert-fail-every N to make every
+Nth conversion fail with a 503. --ignore-paging makes the filter endpoint return
+the first page whatever page is asked for, and --no-count leaves out its total.
+"""
+import argparse
+import base64
+import logging
+from aiohttp import web
+from app.utils.bill_text import normalize_bill_text
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(seed_bills=None, batch_enabled: bool = True, state_code: str = "IA", session_id: int = 937,
+               convert_fail_every: int = 0, ignore_paging: bool = False,
+               report_count: bool = True) -> web.Application:
+    app = web.Application()
+    app["bills"] = {(state_code, session_id): set(seed_bills or [])}
+    app["stats"] = {"filter": 0, "exists": 0, "submit": 0, "convert": 0}
+
+    def bills_for(state: str, session) -> set:
+        return app["bills"].setdefault((state, int(session)), set())
+
+    async def filter_bills(request: web.Request) -> web.Response:
+        app["stats"]["filter"] += 1
+        bills = bills_for(request.query["state_code"], request.query["session_id"])
+        query = request.query.get("query")
+        matches = sorted(b for b in bills if query is None or b == query)
+        data = matches
+        if "per_page" in request.query:
+            per_page = int(request.query["per_page"])
+            page = 1 if ignore_paging else int(request.query.get("page", "1"))
+            start = (page - 1) * per_page
+            data = matches[start:start + per_page]
+        result = {"data": [{"bill_number": b} for b in data]}
+        if report_count:
+            result["count"] = len(matches)
+        return web.json_response(result)
+
+    async def bills_exist(request: web.Request) -> web.Response:
+        app["stats"]["exists"] += 1
+        body = await request.json()
+        bills = bills_for(body["state_code"], body["session_id"])
+        return web.json_response({
+            "existing_bill_numbers": [b for b in body["bill_numbers"] if b in bills]
+        })
+
+    async def submit_bill(request: web.Request) -> web.Response:
+        app["stats"]["submit"] += 1
+        body = await request.json()
+        bill = body["bill"]
+        # The submit endpoint doesn't carry a session id, so file it under the default session
+        bills_for(bill["state_code"], session_id).add(bill["bill_number"])
+        return web.json_response({"status": "created", "bill_number": bill["bill_number"]}, status=201)
+
+    async def convert_bill_text(request: web.Request) -> web.Response:
+        app["stats"]["convert"] += 1
+        if convert_fail_every and app["stats"]["convert"] % convert_fail_every == 0:
+            return web.json_response({"error": "unavailable"}, status=503)
+        body = await request.json()
+        html = base64.b64decode(body["html_content_base64"])
+        # Not real markdown, just the visible text, which is enough to exercise clients
+        return web.json_response({"text": normalize_bill_text(html)})
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response(app["stats"])
+
+    app.router.add_get("/legible/bills/filter", filter_bills)
+    if batch_enabled:
+        app.router.add_post("/legible/bills/exists", bills_exist)
+    app.router.add_post("/internal/bills", submit_bill)
+    app.router.add_post("/api/v1/bill-text/convert", convert_bill_text)
+    app.router.add_get("/_stats", stats)
+    return app
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Upvote API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--seed", default="", help="Comma separated bill numbers that already exist")
+    parser.add_argument("--no-batch", action="store_true", help="Disable the batch existence endpoint")
+    parser.add_argument("--convert-fail-every", type=int, default=0,
+                        help="Fail every Nth conversion request with a 503")
+    parser.add_argument("--ignore-paging", action="store_true", help="Always return the first page of bills")
+    parser.add_argument("--no-count", action="store_true", help="Leave the total count out of filter results")
+    args = parser.parse_args()
+
+    seed = [b.strip() for b in args.seed.split(",") if b.strip()]
+    logger.info(f"Starting Upvote stub on {args.host}:{args.port} with {len(seed)} seeded bills")
+    app = create_app(
+        seed, batch_enabled=not args.no_batch, convert_fail_every=args.convert_fail_every,
+        ignore_paging=args.ignore_paging, report_count=not args.no_count
+    )
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
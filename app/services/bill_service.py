@@ -1,127 +1,378 @@
 import base64
+import hashlib
 import logging
+import random
+import sqlite3
+import time
 import aiohttp
-from bs4 import BeautifulSoup
+from app.services.ingest_service import DB_INGEST_BATCH_SIZE, BillIngestService
 from app.services.slack_service import SlackService
 import asyncio
-from typing import List, Optional
-from app.schemas.bill_schemas import BillResponse
-from app.utils.http_utils import DEFAULT_HEADERS, get_bill_headers
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Union
+from app.schemas.bill_schemas import (
+    BillProcessingProgress,
+    BillProcessingSummary,
+    BillResponse,
+    BillMarkdownResult,
+    BillSubmissionResult,
+    BillVersionUpdate
+)
+from app.utils.http_utils import Base64JsonPayload
+from app.utils.bill_cache import BillCache, CachedBill
+from app.utils.bill_numbers import BillRange, bill_prefix, bill_sort_key, format_bill_ranges, parse_bill_number
+from app.utils.bill_text import text_hash
+from app.utils.bill_text_store import bill_text_store
+from app.utils.fetch_scheduler import FetchScheduler
+from app.utils.http_client import http_clients
+from app.utils.known_bills import known_bills
+from app.utils.markdown_converter import CONVERTER_NAME, markdown_pool
+from app.utils.billpacket_parser import BillpacketRow
+from app.utils.response_cache import response_cache
+from app.utils.session_bills import session_bills
+from app.utils.run_lock import SingleFlightResult
 import os
 from app.models import LegiscanBill, LegiscanSession
 from sqlalchemy import and_
 from datetime import date
 from app.services.session_service import SessionService
+from app.states import StateAdapter, enabled_adapters, get_adapter
+from app.config import STATE_MAX_CONCURRENCY
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+SCRAPE_REQUEST_TIMEOUT = float(os.getenv("SCRAPE_REQUEST_TIMEOUT", "30"))
+SCRAPE_MAX_RETRIES = int(os.getenv("SCRAPE_MAX_RETRIES", "3"))
+# Opt in to checking bills in chunks against a batch existence endpoint, for an Upvote API that
+# has one; if it answers with an error or an unexpected body, per-bill checks are used for
+# CHECK_BATCH_RETRY_SECONDS before it is tried again
+CHECK_BATCH_MODE = os.getenv("CHECK_BATCH_MODE", "false").lower() == "true"
+CHECK_BATCH_PATH = os.getenv("CHECK_BATCH_PATH", "/legible/bills/exists")
+CHECK_BATCH_RETRY_SECONDS = float(os.getenv("CHECK_BATCH_RETRY_SECONDS", "3600"))
+CHECK_CHUNK_SIZE = int(os.getenv("CHECK_CHUNK_SIZE", "100"))
+CHECK_MAX_IN_FLIGHT = int(os.getenv("CHECK_MAX_IN_FLIGHT", "10"))
+# Check existence against the session's full bill list, paged in once per run (or SESSION_SNAPSHOT_TTL),
+# instead of asking the API about each bill
+CHECK_SESSION_SNAPSHOT = os.getenv("CHECK_SESSION_SNAPSHOT", "false").lower() == "true"
+SESSION_SNAPSHOT_PAGE_SIZE = int(os.getenv("SESSION_SNAPSHOT_PAGE_SIZE", "500"))
+SESSION_SNAPSHOT_MAX_PAGES = int(os.getenv("SESSION_SNAPSHOT_MAX_PAGES", "200"))
+SUBMIT_WORKERS = int(os.getenv("SUBMIT_WORKERS", "4"))
+SUBMIT_MAX_RETRIES = int(os.getenv("SUBMIT_MAX_RETRIES", "2"))
+SUBMIT_BACKOFF_BASE = float(os.getenv("SUBMIT_BACKOFF_BASE", "0.5"))
+SUBMIT_REQUEST_TIMEOUT = float(os.getenv("SUBMIT_REQUEST_TIMEOUT", "60"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+PIPELINE_CHECK_BATCH_SIZE = int(os.getenv("PIPELINE_CHECK_BATCH_SIZE", "25"))
+PIPELINE_CHECK_LINGER = float(os.getenv("PIPELINE_CHECK_LINGER", "0.5"))
+# Markdown conversion through the bill formatter API
+FORMATTER_MAX_IN_FLIGHT = int(os.getenv("FORMATTER_MAX_IN_FLIGHT", "4"))
+FORMATTER_RATE = float(os.getenv("FORMATTER_RATE", "10"))
+FORMATTER_REQUEST_TIMEOUT = float(os.getenv("FORMATTER_REQUEST_TIMEOUT", "60"))
+FORMATTER_MAX_RETRIES = int(os.getenv("FORMATTER_MAX_RETRIES", "3"))
+# Opt in to converting markdown in-process (on a process pool) instead of through the formatter
+# API; with MARKDOWN_REMOTE_FALLBACK the formatter is still used for bills the local converter fails on
+MARKDOWN_LOCAL_CONVERTER = os.getenv("MARKDOWN_LOCAL_CONVERTER", "false").lower() == "true"
+MARKDOWN_REMOTE_FALLBACK = os.getenv("MARKDOWN_REMOTE_FALLBACK", "true").lower() == "true"
+# Converter names markdown results are cached under in the bill text store
+MARKDOWN_CONVERTER = "formatter"
+LOCAL_MARKDOWN_CONVERTER = CONVERTER_NAME
+# Unchanged billpacket rows re-fetched per run (least recently checked first) to catch republished bill text
+TEXT_RECHECK_PER_RUN = int(os.getenv("TEXT_RECHECK_PER_RUN", "25"))
+# Also upsert every fetched bill and its text into DATABASE_URL, in batches of DB_INGEST_BATCH_SIZE
+DB_INGEST = os.getenv("DB_INGEST", "false").lower() == "true"
+# Error messages kept on a run's progress record; the full list is in the logs
+PROGRESS_MAX_ERRORS = int(os.getenv("PROGRESS_MAX_ERRORS", "50"))
+
 class BillService:
+    # Monotonic time until which the batch existence endpoint is not tried
+    _batch_check_unavailable_until = 0.0
+
     @staticmethod
-    async def get_bill_html(session: aiohttp.ClientSession, bill_number: str) -> Optional[str]:
-        url = f"https://www.legis.iowa.gov/docs/publications/LGI/91/attachments/{bill_number}.html?layout=false"
-        headers = get_bill_headers(bill_number)
-        
-        try:
-            async with session.get(url, headers=headers) as response:
-                if response.status == 404:
-                    logger.warning(f"Bill {bill_number} not found (404)")
-                    return None
+    def batch_check_available() -> bool:
+        return time.monotonic() >= BillService._batch_check_unavailable_until
+
+    @staticmethod
+    def _mark_batch_check_unavailable(reason: str):
+        logger.warning(
+            f"Batch bill check unavailable ({reason}), using per-bill checks for {CHECK_BATCH_RETRY_SECONDS:.0f}s"
+        )
+        BillService._batch_check_unavailable_until = time.monotonic() + CHECK_BATCH_RETRY_SECONDS
+
+    @staticmethod
+    async def fetch_bill_html(session: aiohttp.ClientSession, bill_number: str,
+                              adapter: Optional[StateAdapter] = None) -> Optional[bytes]:
+        """
+        Fetch a bill attachment's raw HTML bytes, revalidating against the on-disk
+        cache. A 304 response is served from the bill text store, which holds the
+        body under the hash the cache recorded. Transport and HTTP errors are
+        raised so callers can decide whether to retry.
+        """
+        adapter = adapter or get_adapter()
+        bill_cache = adapter.bill_cache
+        url = adapter.attachment_url(bill_number)
+        cached = bill_cache.get(bill_number)
+        headers = {**adapter.attachment_headers(bill_number), **BillCache.conditional_headers(cached)}
+
+        async with session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                content = await BillService._read_cached_html(cached)
+                if content is not None:
+                    logger.info(f"Bill {bill_number} not modified, using stored HTML")
+                    return content
+            elif response.status == 404:
+                logger.warning(f"Bill {bill_number} not found (404)")
+                return None
+            else:
                 response.raise_for_status()
-                text = await response.text()
-                if len(text) < 100:
+                content = await response.read()
+                if len(content) < 100:
                     logger.warning(f"Bill {bill_number} returned empty or invalid content")
                     return None
+                try:
+                    content_hash = await asyncio.to_thread(bill_text_store.put_blob, content)
+                except (OSError, sqlite3.Error) as e:
+                    # Without a stored body a later 304 couldn't be served, so don't revalidate
+                    logger.warning(f"Could not store HTML for bill {bill_number}: {e}")
+                    bill_cache.delete(bill_number)
+                else:
+                    bill_cache.put(
+                        bill_number,
+                        content_hash,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified")
+                    )
                 logger.info(f"Successfully retrieved HTML for bill {bill_number}")
-                return text
+                return content
+
+        # Not modified, but the stored body is gone: fetch it again unconditionally
+        bill_cache.delete(bill_number)
+        return await BillService.fetch_bill_html(session, bill_number, adapter)
+
+    @staticmethod
+    async def _read_cached_html(cached: CachedBill) -> Optional[bytes]:
+        try:
+            return await asyncio.to_thread(bill_text_store.read, cached.content_hash)
+        except (KeyError, OSError, ValueError, RuntimeError, sqlite3.Error) as e:
+            logger.warning(f"Stored HTML for bill {cached.bill_number} unavailable: {type(e).__name__}: {e}")
+            return None
+
+    @staticmethod
+    async def get_bill_html(session: aiohttp.ClientSession, bill_number: str,
+                            adapter: Optional[StateAdapter] = None) -> Optional[bytes]:
+        try:
+            return await BillService.fetch_bill_html(session, bill_number, adapter)
         except Exception as e:
             logger.error(f"Error fetching bill {bill_number}: {e}")
             return None
 
     @staticmethod
-    def convert_to_base64(html_content: str) -> str:
-        return base64.b64encode(html_content.encode()).decode('utf-8')
+    def build_fetch_scheduler(adapter: Optional[StateAdapter] = None) -> FetchScheduler:
+        adapter = adapter or get_adapter()
+        return FetchScheduler(
+            max_in_flight=adapter.max_in_flight,
+            rate_per_host=adapter.rate_per_host,
+            request_timeout=SCRAPE_REQUEST_TIMEOUT,
+            max_retries=SCRAPE_MAX_RETRIES
+        )
 
     @staticmethod
-    async def process_bill_results(
-        bills_data: list,
-        bill_numbers: list,
-        results: list,
-        state_links: list,
-        bill_titles: list
-    ) -> List[BillResponse]:
-        for bill_number, html_content, state_link, bill_title in zip(bill_numbers, results, state_links, bill_titles):
-            if html_content:
-                bills_data.append(BillResponse(
-                    bill_number=bill_number,
-                    bill_title=bill_title,
-                    base64_html=BillService.convert_to_base64(html_content),
-                    state_link=state_link
-                ))
-        return bills_data
+    def convert_to_base64(html_content: Union[str, bytes]) -> str:
+        if isinstance(html_content, str):
+            html_content = html_content.encode()
+        return base64.b64encode(html_content).decode('utf-8')
 
     @staticmethod
-    async def scrape_bills() -> List[BillResponse]:
-        logger.info("Starting bill scraping process")
-        url = "https://www.legis.iowa.gov/legislation/billTracking/billpacket"
-        bills_data = []
+    def parse_billpacket(content: str, adapter: Optional[StateAdapter] = None) -> List[BillpacketRow]:
+        """
+        Extract (bill_number, bill_title, state_link) rows from a state's bill listing page.
+        """
+        adapter = adapter or get_adapter()
+        rows = adapter.parse_listing(content)
+        if not rows:
+            logger.error(f"Could not find any bill rows in {adapter.state_code} listing page")
+        return rows
+
+    @staticmethod
+    async def fetch_billpacket_rows(scheduler: Optional[FetchScheduler] = None,
+                                    adapter: Optional[StateAdapter] = None) -> List[BillpacketRow]:
+        adapter = adapter or get_adapter()
+        url = adapter.listing_url
+        scheduler = scheduler or BillService.build_fetch_scheduler(adapter)
+        session = adapter.http_session(url)
+
+        async def fetch_billpacket() -> str:
+            async with session.get(url, headers=adapter.listing_headers()) as response:
+                response.raise_for_status()
+                return await response.text()
+
+        content = await scheduler.run(url, fetch_billpacket)
+        return BillService.parse_billpacket(content, adapter)
+
+    @staticmethod
+    def filter_rows(
+        rows: List[BillpacketRow],
+        prefixes: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        adapter: Optional[StateAdapter] = None,
+        bill_ranges: Optional[List[BillRange]] = None
+    ) -> List[BillpacketRow]:
+        """
+        Keep rows whose bill number prefix (HF, SF, HSB, SSB, ...) is in `prefixes`,
+        whose number falls in one of `bill_ranges` (see app.utils.bill_numbers)
+        and that first appeared in the billpacket at or after the `since` timestamp.
+        First-seen times come from the local billpacket snapshot; rows the snapshot
+        doesn't know yet count as new. Without a snapshot (process_new_bills never
+        ran on this instance) `since` can't be applied and ValueError is raised.
+        """
+        if prefixes:
+            wanted = {prefix.strip().upper() for prefix in prefixes}
+            rows = [row for row in rows if bill_prefix(row.bill_number) in wanted]
+        if bill_ranges:
+            def in_ranges(bill_number: str) -> bool:
+                try:
+                    parsed = parse_bill_number(bill_number)
+                except ValueError:
+                    return False
+                return any(parsed in bill_range for bill_range in bill_ranges)
+
+            rows = [row for row in rows if in_ranges(row.bill_number)]
+        if since is not None:
+            adapter = adapter or get_adapter()
+            snapshot = adapter.snapshot.load()
+            if snapshot is None:
+                raise ValueError(
+                    f"No {adapter.state_code} billpacket snapshot on this instance, so bills can't be filtered "
+                    f"by first-seen time; it is written where process_new_bills runs"
+                )
+            rows = [
+                row for row in rows
+                if row.bill_number not in snapshot or snapshot[row.bill_number]["first_seen"] >= since
+            ]
+        return rows
+
+    @staticmethod
+    async def iter_bills(
+        rows: Optional[List[BillpacketRow]] = None,
+        prefixes: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        adapter: Optional[StateAdapter] = None,
+        bill_ranges: Optional[List[BillRange]] = None,
+        unpublished: Optional[Set[str]] = None
+    ) -> AsyncIterator[BillResponse]:
+        """
+        Scrape a state's bill listing (Iowa's billpacket page by default) and yield
+        each BillResponse as soon as its attachment HTML has been fetched. Pass
+        `rows` to fetch only those rows instead of the whole listing; `prefixes`,
+        `since` and `bill_ranges` narrow the rows further (see filter_rows).
+        Bills whose attachment isn't published yet (404 or empty) are added to
+        `unpublished` if given, as opposed to fetch errors which are only logged.
+        """
+        adapter = adapter or get_adapter()
+        logger.info(f"Starting bill scraping process for {adapter.state_code}")
+        scheduler = BillService.build_fetch_scheduler(adapter)
+        yielded = 0
 
         try:
-            timeout = aiohttp.ClientTimeout(total=300)
-            connector = aiohttp.TCPConnector(limit=10)
-            async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
-                async with session.get(url, headers=DEFAULT_HEADERS) as response:
-                    response.raise_for_status()
-                    content = await response.text()
-                    
-                    soup = BeautifulSoup(content, 'html.parser')
-                    # Get all relevant tables (both "Bills Filed" and "Study Bills Filed")
-                    tables = soup.find_all('table', class_='standard sortable divideVert')
-                    
-                    if not tables:
-                        logger.error("Could not find any bill tables in page")
-                        return []
-                    
-                    bill_numbers = []
-                    state_links = []
-                    bill_titles = []
-                    tasks = []
-                    
-                    # Iterate over all found tables
-                    for table in tables:
-                        # Loop over the table rows (skip rows containing header cells)
-                        for row in table.find_all('tr'):
-                            if row.find('th'):
-                                continue
-                            cells = row.find_all('td')
-                            if len(cells) < 2:
-                                continue
-                            # Extract bill number from the first column (from the <a> tag)
-                            a_tag = cells[0].find('a')
-                            if not a_tag:
-                                continue
-                            bill_number = a_tag.text.strip().replace(" ", "")
-                            state_link = f"https://www.legis.iowa.gov/legislation/BillBook?ba={bill_number}&ga=91"
-                            # Extract the bill title from the second column
-                            bill_title = cells[1].get_text(separator=" ", strip=True)
-                            
-                            bill_numbers.append(bill_number)
-                            state_links.append(state_link)
-                            bill_titles.append(bill_title)
-                            tasks.append(BillService.get_bill_html(session, bill_number))
-                    
-                    results = await asyncio.gather(*tasks)
-                    bills_data = await BillService.process_bill_results([], bill_numbers, results, state_links, bill_titles)
+            if rows is None:
+                rows = await BillService.fetch_billpacket_rows(scheduler, adapter)
+            if prefixes or since is not None or bill_ranges:
+                rows = BillService.filter_rows(rows, prefixes, since, adapter, bill_ranges)
+                logger.info(f"Filtered billpacket down to {len(rows)} rows")
+            session = adapter.http_session(adapter.attachment_url(""))
+                
+            jobs = (
+                (index, adapter.attachment_url(bill_number),
+                 lambda bill_number=bill_number: BillService.fetch_bill_html(session, bill_number, adapter))
+                for index, (bill_number, _, _) in enumerate(rows)
+            )
+            async for index, result in scheduler.as_completed(jobs):
+                bill_number, bill_title, state_link = rows[index]
+                if isinstance(result, Exception):
+                    logger.error(f"Error fetching bill {bill_number}: {type(result).__name__} {result}")
+                    continue
+                if not result:
+                    if unpublished is not None:
+                        unpublished.add(bill_number)
+                    continue
+                yielded += 1
+                yield BillResponse(
+                    bill_number=bill_number,
+                    bill_title=bill_title,
+                    html=result,
+                    state_link=state_link
+                )
             
-            logger.info(f"Scraping complete. Successfully processed {len(bills_data)} bills")
-            return bills_data
+            logger.info(f"Scraping complete. Successfully processed {yielded} bills")
                     
         except Exception as e:
             logger.error(f"Unexpected error: {str(e)}")
             raise
 
+    @staticmethod
+    async def store_bill_text(bill: BillResponse, state_code: str, session_id: int) -> Optional[BillVersionUpdate]:
+        """
+        Keep a compressed copy of the fetched HTML in the bill text store and
+        return a version update if its normalized text differs from the last
+        stored version. A failure here is logged and never fails the run.
+        """
+        try:
+            return await asyncio.to_thread(BillService._store_bill_text, bill, state_code, session_id)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not store HTML for bill {bill.bill_number}: {e}")
+            return None
+
+    @staticmethod
+    def _store_bill_text(bill: BillResponse, state_code: str, session_id: int) -> Optional[BillVersionUpdate]:
+        normalized_hash = text_hash(bill.html)
+        previous = bill_text_store.get(state_code, session_id, bill.bill_number)
+        stored = bill_text_store.put(state_code, session_id, bill.bill_number, bill.html, text_hash=normalized_hash)
+        if previous is None or stored.version == previous.version:
+            return None
+        update = BillVersionUpdate(
+            bill_number=bill.bill_number,
+            previous_version=previous.version,
+            version=stored.version,
+            previous_text_hash=previous.text_hash,
+            text_hash=normalized_hash,
+            content_hash=stored.content_hash
+        )
+        bill_text_store.record_update(
+            state_code, session_id, bill.bill_number, update.update_type,
+            update.model_dump(exclude={"bill_number", "update_type"})
+        )
+        logger.info(f"Bill {bill.bill_number} text changed: version {previous.version} -> {stored.version}")
+        return update
+
+    @staticmethod
+    def text_recheck_rows(rows: List[BillpacketRow], candidate_rows: List[BillpacketRow],
+                          state_code: str, session_id: int) -> List[BillpacketRow]:
+        """
+        Unchanged billpacket rows whose stored text is due for a re-check. Their
+        attachments are re-fetched (conditionally) only to detect republished text.
+        """
+        try:
+            due = set(bill_text_store.least_recently_checked(
+                state_code, session_id, TEXT_RECHECK_PER_RUN, exclude=[row.bill_number for row in candidate_rows]
+            ))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not pick bills for text re-check: {e}")
+            return []
+        return [row for row in rows if row.bill_number in due]
+
+    @staticmethod
+    async def scrape_bills(
+        prefixes: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        adapter: Optional[StateAdapter] = None,
+        bill_ranges: Optional[List[BillRange]] = None
+    ) -> List[BillResponse]:
+        return [
+            bill async for bill in BillService.iter_bills(
+                prefixes=prefixes, since=since, adapter=adapter, bill_ranges=bill_ranges
+            )
+        ]
+
     @staticmethod
     async def convert_bill_to_markdown(bill_number: str, base64_html: str) -> Optional[dict]:
         formatter_api_url = os.getenv('BILL_FORMATTER_API_BASE_URL')
@@ -132,19 +383,19 @@ class BillService:
         convert_endpoint = f"{formatter_api_url}/api/v1/bill-text/convert"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    convert_endpoint,
-                    json={"html_content_base64": base64_html},
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    response.raise_for_status()
-                    result = await response.json()
+            session = http_clients.get_session(convert_endpoint)
+            async with session.post(
+                convert_endpoint,
+                json={"html_content_base64": base64_html},
+                headers={"Content-Type": "application/json"}
+            ) as response:
+                response.raise_for_status()
+                result = await response.json()
                     
-                    return {
-                        "bill_number": bill_number,
-                        "markdown_text": result["text"]
-                    }
+                return {
+                    "bill_number": bill_number,
+                    "markdown_text": result["text"]
+                }
                     
         except aiohttp.ClientError as e:
             logger.error(f"Error converting bill {bill_number} to markdown: {str(e)}")
@@ -157,10 +408,154 @@ class BillService:
             return None
 
     @staticmethod
-    async def check_for_bills(bill_numbers: List[str], session_id: int, state_code: str) -> List[str]:
+    def formatter_convert_endpoint() -> Optional[str]:
+        formatter_api_url = os.getenv('BILL_FORMATTER_API_BASE_URL')
+        if not formatter_api_url:
+            return None
+        return f"{formatter_api_url}/api/v1/bill-text/convert"
+
+    @staticmethod
+    async def request_markdown(session: aiohttp.ClientSession, endpoint: str, bill: BillResponse) -> str:
+        """
+        POST one bill to the formatter and return its markdown. Errors are raised
+        so the caller's scheduler can retry transient ones.
+        """
+        payload = Base64JsonPayload({"html_content_base64": Base64JsonPayload.PLACEHOLDER}, bill.html)
+        async with session.post(endpoint, data=payload) as response:
+            response.raise_for_status()
+            result = await response.json()
+            return result["text"]
+
+    @staticmethod
+    async def convert_bills_to_markdown(
+        bills: Iterable[BillResponse],
+        max_in_flight: Optional[int] = None
+    ) -> AsyncIterator[BillMarkdownResult]:
+        """
+        Convert bills to markdown, yielding results as they complete. Bills go
+        through the formatter API, or with MARKDOWN_LOCAL_CONVERTER=true are
+        converted in-process on the markdown process pool, falling back to the
+        formatter for bills the local converter fails on (MARKDOWN_REMOTE_FALLBACK).
+        Bills whose HTML was converted before (by content hash) come from the
+        bill text store, and bills sharing the same HTML are converted once.
+        """
+        converters = [LOCAL_MARKDOWN_CONVERTER, MARKDOWN_CONVERTER] if MARKDOWN_LOCAL_CONVERTER else [MARKDOWN_CONVERTER]
+        pending: Dict[str, List[BillResponse]] = {}
+        for bill in bills:
+            try:
+                cached = None
+                for converter in converters:
+                    cached = await asyncio.to_thread(bill_text_store.get_conversion, bill.content_hash, converter)
+                    if cached is not None:
+                        break
+            except sqlite3.Error as e:
+                logger.warning(f"Markdown cache unavailable for bill {bill.bill_number}: {e}")
+                cached = None
+            if cached is not None:
+                yield BillMarkdownResult(
+                    bill_number=bill.bill_number,
+                    content_hash=bill.content_hash,
+                    markdown_text=cached.decode("utf-8"),
+                    cached=True
+                )
+                continue
+            pending.setdefault(bill.content_hash, []).append(bill)
+
+        remote = pending
+        if MARKDOWN_LOCAL_CONVERTER and pending:
+            remote = {}
+            documents = {content_hash: same_html[0].html for content_hash, same_html in pending.items()}
+            async for content_hash, result in markdown_pool.convert_many(documents):
+                if isinstance(result, Exception) or not result:
+                    error = f"{type(result).__name__}: {str(result)}" if isinstance(result, Exception) else "empty output"
+                    logger.warning(f"Local markdown conversion of bill {pending[content_hash][0].bill_number} failed: {error}")
+                    if MARKDOWN_REMOTE_FALLBACK:
+                        remote[content_hash] = pending[content_hash]
+                        continue
+                    for bill in pending[content_hash]:
+                        yield BillMarkdownResult(bill_number=bill.bill_number, content_hash=content_hash, error=error)
+                    continue
+                await BillService._cache_markdown(content_hash, LOCAL_MARKDOWN_CONVERTER, result)
+                for bill in pending[content_hash]:
+                    yield BillMarkdownResult(bill_number=bill.bill_number, content_hash=content_hash, markdown_text=result)
+
+        if remote:
+            async for result in BillService._convert_remote(remote, max_in_flight):
+                yield result
+
+    @staticmethod
+    async def _convert_remote(
+        pending: Dict[str, List[BillResponse]],
+        max_in_flight: Optional[int] = None
+    ) -> AsyncIterator[BillMarkdownResult]:
+        """
+        Convert through the formatter API with bounded concurrency on the pooled
+        formatter session, retrying transient failures.
+        """
+        endpoint = BillService.formatter_convert_endpoint()
+        if endpoint is None:
+            logger.error("BILL_FORMATTER_API_BASE_URL environment variable not set")
+            for content_hash, same_html in pending.items():
+                for bill in same_html:
+                    yield BillMarkdownResult(
+                        bill_number=bill.bill_number,
+                        content_hash=content_hash,
+                        error="BILL_FORMATTER_API_BASE_URL not set"
+                    )
+            return
+
+        session = http_clients.get_session(endpoint)
+        scheduler = FetchScheduler(
+            max_in_flight=max_in_flight or FORMATTER_MAX_IN_FLIGHT,
+            rate_per_host=FORMATTER_RATE,
+            request_timeout=FORMATTER_REQUEST_TIMEOUT,
+            max_retries=FORMATTER_MAX_RETRIES
+        )
+        jobs = (
+            (content_hash, endpoint,
+             lambda bill=same_html[0]: BillService.request_markdown(session, endpoint, bill))
+            for content_hash, same_html in pending.items()
+        )
+        async for content_hash, result in scheduler.as_completed(jobs):
+            error = None
+            if isinstance(result, Exception):
+                error = f"{type(result).__name__}: {str(result)}"
+                logger.error(f"Error converting bill {pending[content_hash][0].bill_number} to markdown: {error}")
+            else:
+                await BillService._cache_markdown(content_hash, MARKDOWN_CONVERTER, result)
+            for bill in pending[content_hash]:
+                yield BillMarkdownResult(
+                    bill_number=bill.bill_number,
+                    content_hash=content_hash,
+                    markdown_text=None if error else result,
+                    error=error
+                )
+
+    @staticmethod
+    async def _cache_markdown(content_hash: str, converter: str, markdown_text: str):
+        try:
+            await asyncio.to_thread(bill_text_store.put_conversion, content_hash, converter, markdown_text.encode("utf-8"))
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not cache markdown for {content_hash}: {e}")
+
+    @staticmethod
+    async def check_for_bills(
+        bill_numbers: List[str],
+        session_id: int,
+        state_code: str,
+        chunk_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ) -> List[str]:
         """
         Uses the Upvote API endpoint to check which bills don't exist in Upvote (i.e. are new).
         It returns a list of bill numbers that are missing.
+
+        With CHECK_SESSION_SNAPSHOT, the session's full bill list is paged in once
+        (see session_bills) and the missing bills are a set difference against it.
+        Otherwise, or if the list can't be loaded, bill numbers are sent in chunks of
+        `chunk_size` to the batch existence endpoint when CHECK_BATCH_MODE is set.
+        Bills not resolved that way are checked individually, with at most
+        `max_in_flight` requests outstanding.
         """
         # Force reload environment variables
         load_dotenv(override=True)
@@ -171,49 +566,133 @@ class BillService:
         access_token = os.getenv("ACCESS_TOKEN")
         client = os.getenv("CLIENT")
         
-        # Add detailed environment variable logging
-        logger.info("Checking environment variables:")
-        logger.info(f"UPVOTE_API_BASE_URL: {'SET' if upvote_api_url else 'MISSING'}")
-        logger.info(f"UPVOTE_API_KEY: {'SET' if upvote_api_key else 'MISSING'}")
-        logger.info(f"UPVOTE_UID: {'SET' if upvote_uid else 'MISSING'}")
-        logger.info(f"ACCESS_TOKEN: {'SET' if access_token else 'MISSING'}")
-        logger.info(f"CLIENT: {'SET' if client else 'MISSING'}")
-        
         if not upvote_api_url or not upvote_api_key or not upvote_uid or not access_token or not client:
             logger.error("Upvote API configuration is missing in environment variables")
+            logger.info(f"UPVOTE_API_BASE_URL: {'SET' if upvote_api_url else 'MISSING'}")
+            logger.info(f"UPVOTE_API_KEY: {'SET' if upvote_api_key else 'MISSING'}")
+            logger.info(f"UPVOTE_UID: {'SET' if upvote_uid else 'MISSING'}")
+            logger.info(f"ACCESS_TOKEN: {'SET' if access_token else 'MISSING'}")
+            logger.info(f"CLIENT: {'SET' if client else 'MISSING'}")
             # If configuration is missing, assume all bills are new
             return bill_numbers
 
-        tasks = []
-        connector = aiohttp.TCPConnector(ssl=False)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            for bill_number in bill_numbers:
-                tasks.append(BillService.async_check_bill_exists(
-                    session,
-                    state_code,
-                    session_id,
-                    bill_number,
-                    upvote_api_url,
-                    upvote_api_key,
-                    upvote_uid,
-                    access_token,
-                    client
-                ))
-            results = await asyncio.gather(*tasks)
-        
-        missing_bills = []
-        for bill_number, result in zip(bill_numbers, results):
-            exists = False
-            if result and isinstance(result, dict):
-                # Add detailed logging for debugging
-                logger.info(f"API response for bill {bill_number}: {result}")
-                exists = result.get("count", 0) > 0 and "data" in result
-            if not exists:
-                missing_bills.append(bill_number)
+        to_check = known_bills.filter_unknown(state_code, session_id, bill_numbers)
+        if len(to_check) < len(bill_numbers):
+            logger.info(f"Skipping {len(bill_numbers) - len(to_check)} bills already known to exist in Upvote")
+        if not to_check:
+            return []
+
+        chunk_size = chunk_size or CHECK_CHUNK_SIZE
+        max_in_flight = max_in_flight or CHECK_MAX_IN_FLIGHT
+        headers = BillService._upvote_auth_headers(upvote_api_key, upvote_uid, access_token, client)
+        existing = set()
+        unresolved = list(to_check)
+
+        session = http_clients.get_session(upvote_api_url)
+        if CHECK_SESSION_SNAPSHOT:
+            try:
+                session_bill_numbers = await session_bills.get(
+                    state_code, session_id,
+                    lambda: BillService.fetch_session_bill_numbers(session, state_code, session_id, upvote_api_url, headers)
+                )
+                existing = {bill_number for bill_number in to_check if bill_number in session_bill_numbers}
+                unresolved = []
+            except Exception as e:
+                logger.warning(f"Could not load {state_code} session {session_id} bill list, checking bills individually: {e}")
+
+        if unresolved and CHECK_BATCH_MODE and BillService.batch_check_available():
+            semaphore = asyncio.Semaphore(max_in_flight)
+            chunks = [to_check[i:i + chunk_size] for i in range(0, len(to_check), chunk_size)]
+            results = await asyncio.gather(*[
+                BillService.async_check_bills_batch(
+                    session, semaphore, state_code, session_id, chunk, upvote_api_url, headers
+                )
+                for chunk in chunks
+            ])
+            unresolved = []
+            for chunk, result in zip(chunks, results):
+                if result is None:
+                    unresolved.extend(chunk)
+                else:
+                    existing.update(result)
+
+        if unresolved:
+            semaphore = asyncio.Semaphore(max_in_flight)
+
+            async def check_one(bill_number: str):
+                async with semaphore:
+                    return await BillService.async_check_bill_exists(
+                        session,
+                        state_code,
+                        session_id,
+                        bill_number,
+                        upvote_api_url,
+                        upvote_api_key,
+                        upvote_uid,
+                        access_token,
+                        client
+                    )
+
+            results = await asyncio.gather(*[check_one(bill_number) for bill_number in unresolved])
+            for bill_number, result in zip(unresolved, results):
+                if result and isinstance(result, dict):
+                    if result.get("count", 0) > 0 and "data" in result:
+                        existing.add(bill_number)
         
-        logger.info(f"Found {len(missing_bills)} new bills out of {len(bill_numbers)} checked via Upvote API")
+        known_bills.add(state_code, session_id, existing, source="check")
+        missing_bills = [bill_number for bill_number in to_check if bill_number not in existing]
+        logger.info(f"Found {len(missing_bills)} new bills out of {len(to_check)} checked via Upvote API")
+        if missing_bills:
+            logger.debug(f"New bills: {format_bill_ranges(missing_bills)}")
         return missing_bills
 
+    @staticmethod
+    def _upvote_auth_headers(upvote_api_key: str, upvote_uid: str, access_token: str, client: str) -> dict:
+        return {
+            "Authorization": f"Bearer {upvote_api_key}",
+            "uid": upvote_uid,
+            "access_token": access_token,
+            "client": client
+        }
+
+    @staticmethod
+    async def async_check_bills_batch(http_session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                                      state_code: str, session_id: int, bill_numbers: List[str],
+                                      upvote_api_url: str, headers: dict) -> Optional[List[str]]:
+        """
+        Ask the batch existence endpoint which of `bill_numbers` already exist.
+        Returns None if the chunk could not be resolved, in which case the caller
+        falls back to per-bill checks. A non-2xx status or a body that isn't the
+        expected JSON marks batching as unavailable for CHECK_BATCH_RETRY_SECONDS.
+        """
+        endpoint = f"{upvote_api_url}{CHECK_BATCH_PATH}"
+        payload = {
+            "state_code": state_code,
+            "session_id": session_id,
+            "bill_numbers": bill_numbers
+        }
+        async with semaphore:
+            if not BillService.batch_check_available():
+                return None
+            try:
+                async with http_session.post(endpoint, json=payload, headers=headers, ssl=False) as response:
+                    if not 200 <= response.status < 300:
+                        BillService._mark_batch_check_unavailable(f"HTTP {response.status}")
+                        return None
+                    try:
+                        result = await response.json()
+                        existing = result["existing_bill_numbers"]
+                        if not isinstance(existing, list) or not all(isinstance(b, str) for b in existing):
+                            raise TypeError("existing_bill_numbers is not a list of bill numbers")
+                    except (aiohttp.ContentTypeError, ValueError, KeyError, TypeError) as e:
+                        BillService._mark_batch_check_unavailable(f"unexpected response: {type(e).__name__} {e}")
+                        return None
+                    logger.debug(f"Batch check of {len(bill_numbers)} bills found {len(existing)} existing")
+                    return existing
+            except Exception as e:
+                logger.error(f"Error batch checking {len(bill_numbers)} bills via API: {type(e).__name__}: {str(e)}")
+                return None
+
     @staticmethod
     async def async_check_bill_exists(http_session: aiohttp.ClientSession, state_code: str, session_id: int, bill_number: str,
                                       upvote_api_url: str, upvote_api_key: str, upvote_uid: str, access_token: str, client: str):
@@ -223,41 +702,243 @@ class BillService:
             "session_id": session_id,
             "query": bill_number
         }
-        headers = {
-            "Authorization": f"Bearer {upvote_api_key}",
-            "uid": upvote_uid,
-            "access_token": access_token,
-            "client": client
-        }
+        headers = BillService._upvote_auth_headers(upvote_api_key, upvote_uid, access_token, client)
         try:
-            logger.info(f"Checking bill {bill_number}")
-            logger.info(f"Endpoint: {endpoint}")
-            logger.info(f"Headers: {headers}")
-            logger.info(f"Params: {params}")
+            logger.debug(f"Checking bill {bill_number} with params {params}")
             
-            async with http_session.get(endpoint, params=params, headers=headers) as response:
+            async with http_session.get(endpoint, params=params, headers=headers, ssl=False) as response:
                 response.raise_for_status()
                 result = await response.json()
-                logger.info(f"Response status: {response.status}")
-                logger.info(f"Response for bill {bill_number}: {result}")
+                logger.debug(f"Response for bill {bill_number}: HTTP {response.status}")
                 return result
         except Exception as e:
-            logger.error(f"Error checking bill {bill_number} existence via API: {str(e)}")
-            logger.error(f"Full error details: {type(e).__name__}: {str(e)}")
+            logger.error(f"Error checking bill {bill_number} existence via API: {type(e).__name__}: {str(e)}")
             return None
 
     @staticmethod
-    async def process_new_bills():
+    async def iter_session_bill_pages(http_session: aiohttp.ClientSession, state_code: str, session_id: int,
+                                      upvote_api_url: str, headers: dict,
+                                      page_size: Optional[int] = None) -> AsyncIterator[List[str]]:
+        """
+        Page through every bill Upvote has for a session, yielding each page's new
+        bill numbers as it arrives. With a reported `count`, pages are read until
+        that many distinct bills were seen, whatever the page lengths. Without one,
+        the first short or empty page is the last. A page that adds no new bill
+        numbers before then (an API ignoring `page`, or the list shifting under us)
+        is an error: a partial list must not be mistaken for the whole session.
+        """
+        endpoint = f"{upvote_api_url}/legible/bills/filter"
+        page_size = page_size or SESSION_SNAPSHOT_PAGE_SIZE
+        unique: Set[str] = set()
+        for page in range(1, SESSION_SNAPSHOT_MAX_PAGES + 1):
+            params = {
+                "state_code": state_code,
+                "session_id": session_id,
+                "page": page,
+                "per_page": page_size
+            }
+            async with http_session.get(endpoint, params=params, headers=headers, ssl=False) as response:
+                response.raise_for_status()
+                result = await response.json()
+            bill_numbers = [bill["bill_number"] for bill in result.get("data", [])]
+            new_bill_numbers = list(dict.fromkeys(b for b in bill_numbers if b not in unique))
+            unique.update(new_bill_numbers)
+            logger.debug(f"Session bill list page {page}: {len(bill_numbers)} bills, {len(new_bill_numbers)} new")
+            if new_bill_numbers:
+                yield new_bill_numbers
+            count = result.get("count")
+            if count is None:
+                # An API that ignores paging returns everything on the first page
+                if len(bill_numbers) != page_size:
+                    return
+            elif len(unique) >= count:
+                return
+            if not new_bill_numbers:
+                raise RuntimeError(
+                    f"Session bill list for {state_code} session {session_id} stopped growing on page {page} "
+                    f"after {len(unique)}{f' of {count}' if count is not None else ''} bills"
+                )
+        raise RuntimeError(f"Session bill list for {state_code} session {session_id} exceeds "
+                           f"{SESSION_SNAPSHOT_MAX_PAGES} pages of {page_size}")
+
+    @staticmethod
+    async def fetch_session_bill_numbers(http_session: aiohttp.ClientSession, state_code: str, session_id: int,
+                                         upvote_api_url: str, headers: dict) -> Set[str]:
+        bill_numbers = set()
+        async for page in BillService.iter_session_bill_pages(
+            http_session, state_code, session_id, upvote_api_url, headers
+        ):
+            bill_numbers.update(page)
+        return bill_numbers
+
+    @staticmethod
+    def build_manual_entry(bill: BillResponse, state_code: str, encode_html: bool = True) -> dict:
+        return {
+            "bill": {
+                "state_code": state_code,
+                "title": bill.bill_title,
+                "summary": bill.bill_title,
+                "bill_number": bill.bill_number,
+                "current_state": "introduced",
+                "introduced_date": date.today().strftime("%Y-%m-%d"),
+                "state_link": bill.state_link,
+                "bill_text_data_base64": bill.base64_html if encode_html else None
+            }
+        }
+
+    @staticmethod
+    def build_manual_entry_payload(bill: BillResponse, state_code: str) -> Base64JsonPayload:
+        """
+        The manual entry as a request body that base64-encodes the bill HTML
+        while it is being sent, instead of holding the encoded copy in memory.
+        """
+        manual_entry = BillService.build_manual_entry(bill, state_code, encode_html=False)
+        manual_entry["bill"]["bill_text_data_base64"] = Base64JsonPayload.PLACEHOLDER
+        return Base64JsonPayload(manual_entry, bill.html)
+
+    @staticmethod
+    def submission_idempotency_key(bill: BillResponse, state_code: str, session_id: int) -> str:
+        key = f"{state_code}:{session_id}:{bill.bill_number}:{bill.content_hash}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    async def submit_bill(
+        http_session: aiohttp.ClientSession,
+        endpoint: str,
+        bill: BillResponse,
+        state_code: str,
+        session_id: int,
+        bill_exists: Callable[[str], Awaitable[bool]]
+    ) -> BillSubmissionResult:
         """
-        Automated process to scrape, check, and submit new bills.
+        POST a bill to Upvote, retrying transient failures. Before every retry the
+        bill is looked up again, since a timed-out or 5xx request may still have
+        been applied; this keeps retries from double-submitting.
+        """
+        headers = {
+            "Idempotency-Key": BillService.submission_idempotency_key(bill, state_code, session_id)
+        }
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                # A fresh payload per attempt, since the body is consumed as it streams
+                async with http_session.post(
+                    endpoint,
+                    data=BillService.build_manual_entry_payload(bill, state_code),
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=SUBMIT_REQUEST_TIMEOUT)
+                ) as response:
+                    response.raise_for_status()
+                    return BillSubmissionResult(
+                        bill_number=bill.bill_number,
+                        status="submitted",
+                        attempts=attempt,
+                        http_status=response.status
+                    )
+            except Exception as e:
+                error = e
+
+            http_status = getattr(error, "status", None)
+            if attempt > SUBMIT_MAX_RETRIES or not FetchScheduler.is_retryable(error):
+                return BillSubmissionResult(
+                    bill_number=bill.bill_number,
+                    status="failed",
+                    attempts=attempt,
+                    http_status=http_status,
+                    error=f"{type(error).__name__}: {str(error)}"
+                )
+            if await bill_exists(bill.bill_number):
+                logger.info(f"Bill {bill.bill_number} exists after failed attempt {attempt}, not resubmitting")
+                return BillSubmissionResult(
+                    bill_number=bill.bill_number,
+                    status="already_exists",
+                    attempts=attempt,
+                    http_status=http_status
+                )
+            delay = random.uniform(0, SUBMIT_BACKOFF_BASE * (2 ** attempt))
+            logger.warning(f"Retrying submission of bill {bill.bill_number} in {delay:.2f}s: {type(error).__name__} {error}")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def run_process_new_bills(
+        full_resync: bool = False,
+        join: bool = True,
+        progress: Optional[BillProcessingProgress] = None,
+        adapter: Optional[StateAdapter] = None
+    ) -> SingleFlightResult:
+        """
+        Run process_new_bills unless a run for the same state is already in flight
+        in this or another process. With `join`, wait for the in-flight run instead
+        of starting a new one; otherwise return immediately with status "skipped".
+        """
+        adapter = adapter or get_adapter()
+        return await adapter.flight.run(
+            lambda: BillService.process_new_bills(full_resync=full_resync, progress=progress, adapter=adapter),
+            join=join
+        )
+
+    @staticmethod
+    async def process_states(
+        state_codes: Optional[Iterable[str]] = None,
+        full_resync: bool = False,
+        join: bool = False
+    ) -> Dict[str, Union[SingleFlightResult, Exception]]:
+        """
+        Process every enabled state (ENABLED_STATES unless `state_codes` is given),
+        at most STATE_MAX_CONCURRENCY at a time. Each state runs under its own lock
+        and fetch limits; a state that fails is logged and returned as its
+        exception without affecting the others.
+        """
+        adapters = enabled_adapters(state_codes)
+        semaphore = asyncio.Semaphore(STATE_MAX_CONCURRENCY)
+
+        async def process_state(adapter: StateAdapter) -> SingleFlightResult:
+            async with semaphore:
+                return await BillService.run_process_new_bills(full_resync=full_resync, join=join, adapter=adapter)
+
+        outcomes = await asyncio.gather(*[process_state(adapter) for adapter in adapters], return_exceptions=True)
+        results = {}
+        for adapter, outcome in zip(adapters, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            if isinstance(outcome, Exception):
+                logger.error(f"Bill processing for {adapter.state_code} failed: {type(outcome).__name__} {outcome}")
+            results[adapter.state_code] = outcome
+        return results
+
+    @staticmethod
+    async def process_new_bills(
+        full_resync: bool = False,
+        progress: Optional[BillProcessingProgress] = None,
+        adapter: Optional[StateAdapter] = None
+    ) -> Optional[BillProcessingSummary]:
+        """
+        Automated process to scrape, check, and submit new bills for one state
+        (Iowa unless `adapter` is given).
         A bill is considered new if it is actually sent (POSTed) to the manual_entry endpoint.
+
+        Only billpacket rows that were added or retitled since the last run are
+        fetched, checked and submitted, unless `full_resync` is set. Step and
+        counts are kept up to date on `progress` as the run goes.
         """
-        logger.info("=== Starting bill processing job ===")
+        progress = progress if progress is not None else BillProcessingProgress()
+        adapter = adapter or get_adapter()
+        state_code = adapter.state_code
+        billpacket_snapshot = adapter.snapshot
+
+        def record_error(message: str):
+            if len(progress.errors) < PROGRESS_MAX_ERRORS:
+                progress.errors.append(message)
+
+        logger.info(f"=== Starting bill processing job for {state_code} ===")
         try:
-            logger.info("Step 1/6: Using hardcoded session ID for Iowa")
-            session_id = 937
+            progress.step = "session"
+            logger.info(f"Step 1/6: Resolving session ID for {adapter.name}")
+            session_id = adapter.resolve_session_id()
             logger.info(f"Using session ID: {session_id}")
             
+            progress.step = "configuration"
             logger.info("Step 2/6: Checking API configuration")
             upvote_api_url = os.getenv('UPVOTE_API_BASE_URL')
             upvote_api_key = os.getenv('UPVOTE_API_KEY')
@@ -272,73 +953,222 @@ class BillService:
                 logger.info(f"UPVOTE_UID: {'SET' if upvote_uid else 'MISSING'}")
                 logger.info(f"ACCESS_TOKEN: {'SET' if access_token else 'MISSING'}")
                 logger.info(f"CLIENT: {'SET' if client else 'MISSING'}")
+                record_error("Missing required environment variables")
                 return
             logger.info("API configuration validated")
             
-            logger.info("Step 3/6: Scraping bills from Iowa legislature website")
-            bills = await BillService.scrape_bills()
-            logger.info(f"Found {len(bills)} total bills")
-            
-            logger.info("Step 4/6: Checking for new bills")
-            bill_numbers = [bill.bill_number for bill in bills]
-            new_bills = await BillService.check_for_bills(bill_numbers, session_id, "IA")
-            
-            total_bills = len(bills)
-            if not new_bills:
-                logger.info("No new bills found")
-                await SlackService.notify_bill_processing(
-                    total_bills=total_bills,
-                    new_bills=[],
-                    duplicate_count=total_bills
+            progress.step = "scrape"
+            logger.info(f"Step 3/6: Scraping bills from {adapter.name} legislature website")
+            rows = await BillService.fetch_billpacket_rows(adapter=adapter)
+            previous_snapshot = billpacket_snapshot.load()
+            delta = billpacket_snapshot.diff(rows, previous_snapshot or {})
+            if full_resync or previous_snapshot is None:
+                logger.info(f"Full resync: processing all {len(rows)} billpacket rows")
+                candidate_rows = rows
+            else:
+                logger.info(
+                    f"Billpacket delta: {len(delta.added)} added, {len(delta.retitled)} retitled, "
+                    f"{len(delta.removed)} removed, {len(delta.retrying)} retrying, {len(delta.waiting)} waiting, {delta.unchanged} unchanged"
                 )
-                return
-            
-            logger.info(f"Step 5/6: Submitting {len(new_bills)} new bills to Upvote API")
+                if delta.removed:
+                    logger.info(f"Rows removed from billpacket: {format_bill_ranges(delta.removed)}")
+                candidate_rows = delta.changed_rows
+            recheck_rows = BillService.text_recheck_rows(rows, candidate_rows, state_code, session_id)
+            if recheck_rows:
+                logger.info(f"Re-checking text of {len(recheck_rows)} unchanged bills")
+            if CHECK_SESSION_SNAPSHOT:
+                # Page the session's bill list in fresh once for this run
+                session_bills.invalidate(state_code, session_id)
+            candidate_numbers = {row.bill_number for row in candidate_rows}
+            progress.total_bills = len(rows)
+            progress.candidate_bills = len(candidate_rows)
+            progress.step = "pipeline"
+            logger.info("Step 4/6: Checking for new bills as they are scraped")
+            logger.info("Step 5/6: Submitting new bills to Upvote API as they are found")
             endpoint = f"{upvote_api_url}/internal/bills?api_key={upvote_api_key}"
+            check_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            submit_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            total_bills = len(rows)
+            fetched_bills = set()
+            unpublished_bills = set()
             success_count = 0
             error_count = 0
             submitted_new_bills = []
-            
-            async with aiohttp.ClientSession() as session:
-                for bill_number in new_bills:
-                    logger.info(f"Processing bill {bill_number}")
-                    bill_data = next((b for b in bills if b.bill_number == bill_number), None)
-                    if bill_data:
-                        manual_entry = {
-                            "bill": {
-                                "state_code": "IA",
-                                "title": bill_data.bill_title,
-                                "summary": bill_data.bill_title,
-                                "bill_number": bill_number,
-                                "current_state": "introduced",
-                                "introduced_date": date.today().strftime("%Y-%m-%d"),
-                                "state_link": bill_data.state_link,
-                                "bill_text_data_base64": bill_data.base64_html
-                            }
-                        }
-                        
+            submission_results: Dict[str, BillSubmissionResult] = {}
+            text_updates: List[BillVersionUpdate] = []
+            ingest_buffer: List[BillResponse] = []
+            ingested_count = 0
+
+            async def flush_ingest():
+                nonlocal ingested_count
+                batch = ingest_buffer[:]
+                ingest_buffer.clear()
+                try:
+                    result = await BillIngestService.ingest_bills_async(batch, state_code, session_id)
+                    ingested_count += result.bills
+                except Exception as e:
+                    # The database copy is secondary to Upvote, don't fail the run over it
+                    logger.error(f"Error ingesting {len(batch)} bills into the database: {type(e).__name__} {e}")
+                    record_error(f"database ingest: {type(e).__name__}: {str(e)}")
+
+            async def scrape_stage():
+                async for bill in BillService.iter_bills(
+                    candidate_rows + recheck_rows, adapter=adapter, unpublished=unpublished_bills
+                ):
+                    update = await BillService.store_bill_text(bill, state_code, session_id)
+                    if update is not None:
+                        text_updates.append(update)
+                    if DB_INGEST:
+                        ingest_buffer.append(bill)
+                        if len(ingest_buffer) >= DB_INGEST_BATCH_SIZE:
+                            await flush_ingest()
+                    if bill.bill_number not in candidate_numbers:
+                        # Re-checked only for text changes, it was already submitted
+                        continue
+                    fetched_bills.add(bill.bill_number)
+                    progress.fetched_bills = len(fetched_bills)
+                    await check_queue.put(bill)
+                if ingest_buffer:
+                    await flush_ingest()
+                await check_queue.put(None)
+
+            async def check_stage():
+                done = False
+                while not done:
+                    # Block for the first bill, then keep filling the batch for up to
+                    # PIPELINE_CHECK_LINGER seconds so existence checks go out in chunks
+                    batch = []
+                    bill = await check_queue.get()
+                    deadline = asyncio.get_running_loop().time() + PIPELINE_CHECK_LINGER
+                    while bill is not None:
+                        batch.append(bill)
+                        if len(batch) >= PIPELINE_CHECK_BATCH_SIZE:
+                            break
+                        remaining = deadline - asyncio.get_running_loop().time()
                         try:
-                            async with session.post(
-                                endpoint,
-                                json=manual_entry,
-                                headers={"Content-Type": "application/json"}
-                            ) as response:
-                                response.raise_for_status()
-                                success_count += 1
-                                submitted_new_bills.append(bill_number)
-                                logger.info(f"Successfully submitted bill {bill_number}")
-                        except Exception as e:
-                            error_count += 1
-                            logger.error(f"Error submitting bill {bill_number}: {str(e)}")
+                            bill = await asyncio.wait_for(check_queue.get(), timeout=max(remaining, 0))
+                        except asyncio.TimeoutError:
+                            break
+                    done = bill is None
+                    if not batch:
+                        continue
+                    new_bill_numbers = set(await BillService.check_for_bills(
+                        [b.bill_number for b in batch], session_id, state_code
+                    ))
+                    progress.checked_bills += len(batch)
+                    for bill in batch:
+                        if bill.bill_number in new_bill_numbers:
+                            await submit_queue.put(bill)
+                await submit_queue.put(None)
+
+            async def bill_exists(bill_number: str, http_session: aiohttp.ClientSession) -> bool:
+                result = await BillService.async_check_bill_exists(
+                    http_session, state_code, session_id, bill_number,
+                    upvote_api_url, upvote_api_key, upvote_uid, access_token, client
+                )
+                return bool(result and isinstance(result, dict) and result.get("count", 0) > 0 and "data" in result)
+
+            async def submit_worker(session: aiohttp.ClientSession):
+                nonlocal success_count, error_count
+                while True:
+                    bill_data = await submit_queue.get()
+                    if bill_data is None:
+                        # Put the sentinel back so the other workers stop too
+                        await submit_queue.put(None)
+                        return
+                    bill_number = bill_data.bill_number
+                    logger.info(f"Processing bill {bill_number}")
+                    result = await BillService.submit_bill(
+                        session, endpoint, bill_data, state_code, session_id,
+                        lambda number: bill_exists(number, session)
+                    )
+                    submission_results[bill_number] = result
+                    if result.status == "failed":
+                        error_count += 1
+                        progress.failed_bills = error_count
+                        record_error(f"{bill_number}: {result.error}")
+                        logger.error(f"Error submitting bill {bill_number} after {result.attempts} attempts: {result.error}")
+                        continue
+                    success_count += 1
+                    progress.submitted_bills = success_count
+                    submitted_new_bills.append(bill_number)
+                    known_bills.add(state_code, session_id, [bill_number], source="submit")
+                    session_bills.add(state_code, session_id, [bill_number])
+                    logger.info(f"Successfully submitted bill {bill_number} ({result.status})")
+
+            async def submit_stage():
+                session = http_clients.get_session(endpoint)
+                await asyncio.gather(*[submit_worker(session) for _ in range(SUBMIT_WORKERS)])
+
+            if candidate_rows or recheck_rows:
+                await BillService._run_stages(scrape_stage(), check_stage(), submit_stage())
+            logger.info(f"Found {total_bills} total bills, fetched {len(fetched_bills)} of {len(candidate_rows)} candidate bills")
+
+            # Rows that failed to fetch or submit are flagged in the snapshot so they are retried next run;
+            # rows whose attachment isn't published yet are retried with a backoff and not reported
+            unpublished_bills &= candidate_numbers
+            if unpublished_bills:
+                logger.info(f"Not published yet, retrying later: {format_bill_ranges(unpublished_bills)}")
+            failed = {
+                row[0] for row in candidate_rows if row[0] not in fetched_bills and row[0] not in unpublished_bills
+            }
+            failed.update(b for b, result in submission_results.items() if result.status == "failed")
+            for bill_number in sorted(failed - submission_results.keys(), key=bill_sort_key):
+                record_error(f"{bill_number}: could not be fetched")
+            billpacket_snapshot.save(
+                rows, previous_snapshot, skip=failed, unpublished=unpublished_bills,
+                waiting=[b for b in delta.waiting if b not in candidate_numbers]
+            )
+            if submitted_new_bills:
+                # Cached /check-bills answers may still list bills that were just submitted
+                try:
+                    response_cache.invalidate("check-bills:")
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not invalidate cached bill checks: {e}")
             
+            progress.step = "notify"
+            logger.info("Step 6/6: Sending Slack notification")
             await SlackService.notify_bill_processing(
+                state_code=state_code,
                 total_bills=total_bills,
                 new_bills=submitted_new_bills,
-                duplicate_count=total_bills - len(submitted_new_bills)
+                duplicate_count=total_bills - len(submitted_new_bills),
+                updated_bills=[update.bill_number for update in text_updates]
             )
             
-            logger.info("=== Bill processing complete ===")
-            logger.info(f"Summary: {success_count} bills submitted successfully, {error_count} failures")
+            logger.info(f"=== Bill processing complete for {state_code} ===")
+            logger.info(
+                f"Summary: {success_count} bills submitted successfully, {error_count} failures, "
+                f"{len(text_updates)} text changes"
+            )
+            progress.step = "done"
+            return BillProcessingSummary(
+                total_bills=total_bills,
+                candidate_bills=len(candidate_rows),
+                fetched_bills=len(fetched_bills),
+                submitted_bills=submitted_new_bills,
+                failed_bills=sorted(failed, key=bill_sort_key),
+                unpublished_bills=sorted(unpublished_bills, key=bill_sort_key),
+                billpacket_changed=previous_snapshot is not None and delta.listing_changed,
+                submissions=list(submission_results.values()),
+                text_updates=text_updates,
+                ingested_bills=ingested_count
+            )
         except Exception as e:
-            logger.error(f"Error in automated bill processing: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error(f"Error in automated bill processing for {state_code}: {str(e)}")
+            record_error(f"{type(e).__name__}: {str(e)}")
+            raise
+
+    @staticmethod
+    async def _run_stages(*stages):
+        """
+        Run pipeline stages concurrently. If any stage fails, the others are
+        cancelled and the first error is raised.
+        """
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Index, Table, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.session import get_engine
+from app.models import LegiscanBill, LegiscanBillText
+from app.schemas.bill_schemas import BillIngestResult, BillResponse
+from app.utils.bill_numbers import parse_bill_number
+from app.utils.bill_text import text_hash
+
+logger = logging.getLogger(__name__)
+
+# Bills per multi-row INSERT ... ON CONFLICT statement
+DB_INGEST_BATCH_SIZE = int(os.getenv("DB_INGEST_BATCH_SIZE", "500"))
+ENTRY_SOURCE = "scrape"
+# The legiscan tables belong to the Rails app, whose migrations own their indexes. Only create
+# the upserts' unique indexes at runtime when asked to; a SQLite stand-in always gets them
+DB_CREATE_INGEST_INDEXES = os.getenv("DB_CREATE_INGEST_INDEXES", "false").lower() == "true"
+
+# Conflict targets for the upserts, which need a unique index (or constraint) on exactly these columns
+BILL_KEY = ("state_code", "legiscan_session_id", "readable_bill_number")
+BILL_TEXT_KEY = ("legiscan_bill_id", "text_hash")
+INGEST_INDEXES = [
+    Index("index_legiscan_bills_on_scrape_key", *(LegiscanBill.__table__.c[name] for name in BILL_KEY), unique=True),
+    Index("index_legiscan_bill_texts_on_scrape_key", *(LegiscanBillText.__table__.c[name] for name in BILL_TEXT_KEY),
+          unique=True),
+]
+
+
+class BillIngestService:
+    # Engines whose unique indexes have been checked in this process
+    _indexed_engines = set()
+
+    @staticmethod
+    def ensure_indexes(engine: Optional[Engine] = None, create: Optional[bool] = None):
+        """
+        Make sure the unique indexes the upserts conflict on exist. They are only
+        created with `create` (by default: on SQLite or with DB_CREATE_INGEST_INDEXES);
+        otherwise a missing one raises, naming the migration that is needed.
+        """
+        engine = engine or get_engine()
+        if id(engine) in BillIngestService._indexed_engines:
+            return
+        if create is None:
+            create = DB_CREATE_INGEST_INDEXES or engine.dialect.name == "sqlite"
+        if create:
+            for index in INGEST_INDEXES:
+                index.create(engine, checkfirst=True)
+        else:
+            inspector = inspect(engine)
+            for index in INGEST_INDEXES:
+                table_name = index.table.name
+                columns = [column.name for column in index.columns]
+                unique_keys = [
+                    entry["column_names"] for entry in inspector.get_indexes(table_name) if entry["unique"]
+                ] + [entry["column_names"] for entry in inspector.get_unique_constraints(table_name)]
+                if columns not in unique_keys:
+                    raise RuntimeError(
+                        f"{table_name} has no unique index on ({', '.join(columns)}), which bulk ingest "
+                        f"upserts on. Add it with a migration (e.g. {index.name}), or create it with "
+                        f"python -m app.scripts.ingest_bills --create-indexes"
+                    )
+        BillIngestService._indexed_engines.add(id(engine))
+
+    @staticmethod
+    def upsert_rows(conn: Connection, table: Table, rows: List[dict], key: Sequence[str],
+                    update_columns: Sequence[str], returning: Sequence[str] = ()) -> list:
+        """
+        One multi-row INSERT ... ON CONFLICT (key) DO UPDATE for all `rows`, on
+        Postgres or SQLite. Rows repeating a key are collapsed to the last one, since
+        a single statement may not update the same row twice.
+        """
+        if not rows:
+            return []
+        rows = list({tuple(row[name] for name in key): row for row in rows}.values())
+        dialect = conn.engine.dialect.name
+        if dialect == "postgresql":
+            insert = postgresql.insert
+        elif dialect == "sqlite":
+            insert = sqlite.insert
+        else:
+            raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+        statement = insert(table).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key),
+            set_={name: statement.excluded[name] for name in update_columns}
+        )
+        if returning:
+            statement = statement.returning(*(table.c[name] for name in returning))
+            return list(conn.execute(statement))
+        conn.execute(statement)
+        return []
+
+    @staticmethod
+    def bill_row(bill: BillResponse, state_code: str, session_id: int, now: datetime) -> dict:
+        try:
+            chamber = parse_bill_number(bill.bill_number).chamber
+        except ValueError:
+            chamber = None
+        return {
+            "state_code": state_code,
+            "legiscan_session_id": session_id,
+            "readable_bill_number": bill.bill_number,
+            "current_bill_number": bill.bill_number,
+            "current_title": bill.bill_title,
+            "current_state_link": bill.state_link,
+            "chamber": chamber,
+            "has_bill_text": True,
+            "entry_source": ENTRY_SOURCE,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    @staticmethod
+    def bill_text_row(bill: BillResponse, legiscan_bill_id: int, now: datetime) -> dict:
+        return {
+            "legiscan_bill_id": legiscan_bill_id,
+            "text_hash": text_hash(bill.html),
+            "state_link": bill.state_link,
+            "mime": "text/html",
+            "text_size": len(bill.html),
+            "doc": bill.html.decode("utf-8", errors="replace"),
+            "entry_source": ENTRY_SOURCE,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    @staticmethod
+    def ingest_bills(bills: List[BillResponse], state_code: str, session_id: int,
+                     batch_size: Optional[int] = None, engine: Optional[Engine] = None) -> BillIngestResult:
+        """
+        Upsert scraped bills into legiscan_bills and their HTML into
+        legiscan_bill_texts, `batch_size` bills per statement. Each batch is its own
+        transaction of two statements: the bills (returning their ids) and then
+        their texts, keyed by normalized text hash so unchanged text isn't duplicated.
+        """
+        engine = engine or get_engine()
+        batch_size = batch_size or DB_INGEST_BATCH_SIZE
+        BillIngestService.ensure_indexes(engine)
+        result = BillIngestResult()
+        bill_table, text_table = LegiscanBill.__table__, LegiscanBillText.__table__
+
+        for start in range(0, len(bills), batch_size):
+            batch = bills[start:start + batch_size]
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            with engine.begin() as conn:
+                ids: Dict[str, int] = {
+                    row.readable_bill_number: row.id
+                    for row in BillIngestService.upsert_rows(
+                        conn, bill_table,
+                        [BillIngestService.bill_row(bill, state_code, session_id, now) for bill in batch],
+                        key=BILL_KEY,
+                        update_columns=["current_title", "current_state_link", "has_bill_text", "updated_at"],
+                        returning=["id", "readable_bill_number"]
+                    )
+                }
+                text_rows = [
+                    BillIngestService.bill_text_row(bill, ids[bill.bill_number], now)
+                    for bill in batch if bill.bill_number in ids
+                ]
+                BillIngestService.upsert_rows(
+                    conn, text_table, text_rows, key=BILL_TEXT_KEY, update_columns=["state_link", "updated_at"]
+                )
+            result.bills += len(ids)
+            result.texts += len(text_rows)
+            result.statements += 2
+        logger.info(
+            f"Ingested {result.bills} {state_code} bills and {result.texts} texts in {result.statements} statements"
+        )
+        return result
+
+    @staticmethod
+    async def ingest_bills_async(bills: List[BillResponse], state_code: str, session_id: int,
+                                 batch_size: Optional[int] = None) -> BillIngestResult:
+        return await asyncio.to_thread(BillIngestService.ingest_bills, bills, state_code, session_id, batch_size)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+from typing import Optional, Set, Tuple
+from app.schemas.bill_schemas import BillProcessingProgress, JobStatusResponse
+from app.services.bill_service import BillService
+from app.states import StateAdapter, get_adapter
+from app.utils.job_store import job_store
+
+logger = logging.getLogger(__name__)
+
+# How often a running job writes its progress (and heartbeat) to the job store
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "2"))
+
+# Strong references to running job tasks so they aren't garbage collected mid-run
+_running_tasks: Set[asyncio.Task] = set()
+
+
+class JobService:
+    @staticmethod
+    async def start_bill_processing(full_resync: bool = False,
+                                    adapter: Optional[StateAdapter] = None) -> Tuple[JobStatusResponse, bool]:
+        """
+        Start bill processing for one state (Iowa by default) in the background of
+        this worker and return its job. If a run for that state is already queued or
+        running in any worker, that job is returned instead and the second value is False.
+        """
+        adapter = adapter or get_adapter()
+        # Jobs are deduplicated per state, under the same name as the state's run lock
+        job, created = await asyncio.to_thread(
+            job_store.create_or_get_active, adapter.flight.name,
+            {"full_resync": full_resync, "state_code": adapter.state_code}
+        )
+        if created:
+            task = asyncio.create_task(JobService._run_bill_processing(job["id"], full_resync, adapter))
+            _running_tasks.add(task)
+            task.add_done_callback(_running_tasks.discard)
+            logger.info(f"Started {adapter.state_code} bill processing job {job['id']} (full_resync={full_resync})")
+        else:
+            logger.info(f"Bill processing job {job['id']} already {job['status']}, not starting another")
+        return JobService._to_response(job, deduplicated=not created), created
+
+    @staticmethod
+    async def get_job(job_id: str) -> Optional[JobStatusResponse]:
+        job = await asyncio.to_thread(job_store.get, job_id)
+        return JobService._to_response(job) if job else None
+
+    @staticmethod
+    async def _run_bill_processing(job_id: str, full_resync: bool, adapter: StateAdapter):
+        progress = BillProcessingProgress()
+        await asyncio.to_thread(job_store.update, job_id, status="running", progress=progress.model_dump())
+        reporter = asyncio.create_task(JobService._report_progress(job_id, progress))
+        try:
+            # Joins a run already in flight in this or another process rather than overlapping it
+            outcome = await BillService.run_process_new_bills(
+                full_resync=full_resync, join=True, progress=progress, adapter=adapter
+            )
+        except Exception as e:
+            logger.error(f"Bill processing job {job_id} failed: {str(e)}")
+            status, result, error = "failed", None, f"{type(e).__name__}: {str(e)}"
+        else:
+            if outcome.status == "joined":
+                progress.step = "joined"
+            summary = outcome.result
+            status, result, error = "completed", summary.model_dump() if summary else None, None
+        finally:
+            reporter.cancel()
+        await asyncio.to_thread(
+            job_store.update, job_id, status=status, progress=progress.model_dump(), result=result, error=error
+        )
+        logger.info(f"Bill processing job {job_id} {status}")
+
+    @staticmethod
+    async def _report_progress(job_id: str, progress: BillProcessingProgress):
+        while True:
+            await asyncio.sleep(JOB_PROGRESS_INTERVAL)
+            try:
+                await asyncio.to_thread(job_store.update, job_id, progress=progress.model_dump())
+            except Exception as e:
+                logger.warning(f"Could not record progress for job {job_id}: {e}")
+
+    @staticmethod
+    def _to_response(job: dict, deduplicated: bool = False) -> JobStatusResponse:
+        return JobStatusResponse(
+            job_id=job["id"],
+            kind=job["kind"],
+            status=job["status"],
+            created_at=job["created_at"],
+            updated_at=job["updated_at"],
+            deduplicated=deduplicated,
+            progress=job["progress"],
+            result=job["result"],
+            error=job["error"]
+        )
@@ -1,4 +1,5 @@
 import logging
+from app.states import get_adapter
 
 logger = logging.getLogger(__name__)
 
@@ -6,8 +7,9 @@ class SessionService:
     @staticmethod
     def get_latest_session_id(state_code: str) -> int:
         """
-        Returns a hardcoded session ID for a given state.
-        Since we are no longer using the database, we return 153.
+        Returns the current session ID for a given state, as resolved by its
+        scraper adapter (see app.states).
         """
-        logger.info(f"Using hardcoded session ID (153) for state {state_code}")
-        return 153
\ No newline at end of file
+        session_id = get_adapter(state_code).resolve_session_id()
+        logger.info(f"Using session ID {session_id} for state {state_code}")
+        return session_id
@@ -1,16 +1,17 @@
-import aiohttp
 import os
 import logging
-from typing import List
+from typing import List, Optional
+from app.utils.http_client import http_clients
 
 logger = logging.getLogger(__name__)
 
 class SlackService:
     @staticmethod
-    async def notify_bill_processing(total_bills: int, new_bills: List[str], duplicate_count: int):
+    async def notify_bill_processing(total_bills: int, new_bills: List[str], duplicate_count: int,
+                                     updated_bills: Optional[List[str]] = None, state_code: str = "IA"):
         """
         Send a Slack notification about bill processing results,
-        including counts for new and duplicate bills.
+        including counts for new and duplicate bills and bills whose text changed.
         """
         webhook_url = os.getenv('SLACK_WEBHOOK_URL')
         if not webhook_url:
@@ -18,21 +19,29 @@ class SlackService:
             return
 
         try:
-            message = "IA Bill Scraper Execution Complete\n"
+            message = f"{state_code} Bill Scraper Execution Complete\n"
             message += f"Total Bills Scanned: {total_bills}\n"
             message += f"New Bills Found: {len(new_bills)}\n"
             message += f"Duplicate Bills Found: {duplicate_count}\n"
             
+            if updated_bills:
+                message += f"Bills With Text Changes: {len(updated_bills)}\n"
+            
             if new_bills:
                 message += "\nNew Bills:\n"
                 message += "\n".join([f"• {bill}" for bill in new_bills])
 
-            async with aiohttp.ClientSession() as session:
-                await session.post(
-                    webhook_url,
-                    json={"text": message},
-                    headers={"Content-Type": "application/json"}
-                )
+            if updated_bills:
+                message += "\n\nUpdated Bills:\n" if new_bills else "\nUpdated Bills:\n"
+                message += "\n".join([f"• {bill}" for bill in updated_bills])
+
+            session = http_clients.get_session(webhook_url)
+            async with session.post(
+                webhook_url,
+                json={"text": message},
+                headers={"Content-Type": "application/json"}
+            ):
+                pass
             logger.info("Slack notification sent successfully")
         except Exception as e:
             logger.error(f"Error sending Slack notification: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import Dict, Iterable, List, Optional
+
+from app.config import ENABLED_STATES
+from app.states.base import StateAdapter
+from app.states.iowa import IowaAdapter
+
+DEFAULT_STATE_CODE = "IA"
+
+ADAPTERS: Dict[str, StateAdapter] = {adapter.state_code: adapter for adapter in (IowaAdapter(),)}
+
+
+def get_adapter(state_code: Optional[str] = None) -> StateAdapter:
+    state_code = (state_code or DEFAULT_STATE_CODE).upper()
+    try:
+        return ADAPTERS[state_code]
+    except KeyError:
+        raise ValueError(f"No scraper adapter for state {state_code}") from None
+
+
+def enabled_adapters(state_codes: Optional[Iterable[str]] = None) -> List[StateAdapter]:
+    return [get_adapter(state_code) for state_code in (state_codes or ENABLED_STATES)]
@@ -0,0 +1,73 @@
+import os
+from abc import ABC, abstractmethod
+from functools import cached_property
+from typing import List
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from app.utils.bill_cache import BillCache
+from app.utils.billpacket_parser import BillpacketRow
+from app.utils.billpacket_snapshot import BillpacketSnapshot
+from app.utils.http_client import http_clients
+from app.utils.http_utils import DEFAULT_HEADERS
+from app.utils.run_lock import SingleFlight
+
+
+class StateAdapter(ABC):
+    """
+    Everything state-specific about scraping one legislature: where its bill
+    listing lives and how to parse it, where each bill's text is and which
+    headers to send, how to resolve the current session, and the fetch limits
+    to apply to its hosts.
+
+    Each adapter also owns its local state (billpacket snapshot, attachment
+    cache and run lock), so states are processed independently of each other.
+    """
+
+    state_code: str = ""
+    name: str = ""
+    listing_url: str = ""
+    max_in_flight: int = 8
+    rate_per_host: float = 4.0
+
+    @abstractmethod
+    def resolve_session_id(self) -> int:
+        ...
+
+    @abstractmethod
+    def parse_listing(self, content: str) -> List[BillpacketRow]:
+        ...
+
+    @abstractmethod
+    def attachment_url(self, bill_number: str) -> str:
+        ...
+
+    def listing_headers(self) -> dict:
+        return DEFAULT_HEADERS
+
+    def attachment_headers(self, bill_number: str) -> dict:
+        return DEFAULT_HEADERS
+
+    def http_session(self, url: str) -> aiohttp.ClientSession:
+        """
+        Shared session for one of this state's hosts, its connection pool sized
+        to the adapter's in-flight cap (the scheduler never needs more).
+        """
+        http_clients.configure_host(urlsplit(url).netloc, self.max_in_flight)
+        return http_clients.get_session(url)
+
+    @cached_property
+    def snapshot(self) -> BillpacketSnapshot:
+        return BillpacketSnapshot(os.path.join(".cache", f"billpacket_snapshot_{self.state_code.lower()}.json"))
+
+    @cached_property
+    def bill_cache(self) -> BillCache:
+        return BillCache(os.path.join(".cache", "bill_html", self.state_code.lower()))
+
+    @cached_property
+    def flight(self) -> SingleFlight:
+        return SingleFlight(f"process_new_bills_{self.state_code.lower()}")
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.state_code}>"
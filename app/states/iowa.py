@@ -0,0 +1,56 @@
+import os
+from functools import cached_property
+from typing import List
+
+from app.states.base import StateAdapter
+from app.utils.bill_cache import BillCache, bill_cache
+from app.utils.billpacket_parser import BillpacketRow, parse_billpacket
+from app.utils.billpacket_snapshot import BillpacketSnapshot, billpacket_snapshot
+from app.utils.http_utils import get_bill_headers
+from app.utils.run_lock import SingleFlight
+
+
+class IowaAdapter(StateAdapter):
+    state_code = "IA"
+    name = "Iowa"
+    listing_url = "https://www.legis.iowa.gov/legislation/billTracking/billpacket"
+
+    def __init__(self):
+        self.general_assembly = int(os.getenv("IA_GENERAL_ASSEMBLY", "91"))
+        self.session_id = int(os.getenv("IA_SESSION_ID", "937"))
+        self.max_in_flight = int(os.getenv("SCRAPE_MAX_IN_FLIGHT", "8"))
+        self.rate_per_host = float(os.getenv("SCRAPE_RATE_PER_HOST", "4"))
+
+    def resolve_session_id(self) -> int:
+        return self.session_id
+
+    def parse_listing(self, content: str) -> List[BillpacketRow]:
+        return parse_billpacket(
+            content,
+            f"https://www.legis.iowa.gov/legislation/BillBook?ba={{bill_number}}&ga={self.general_assembly}"
+        )
+
+    def attachment_url(self, bill_number: str) -> str:
+        return (
+            f"https://www.legis.iowa.gov/docs/publications/LGI/{self.general_assembly}"
+            f"/attachments/{bill_number}.html?layout=false"
+        )
+
+    def attachment_headers(self, bill_number: str) -> dict:
+        return {
+            **get_bill_headers(bill_number),
+            "Referer": f"https://www.legis.iowa.gov/legislation/BillBook?ba={bill_number}&ga={self.general_assembly}"
+        }
+
+    # Iowa keeps the snapshot, cache and lock it had before there were adapters
+    @cached_property
+    def snapshot(self) -> BillpacketSnapshot:
+        return billpacket_snapshot
+
+    @cached_property
+    def bill_cache(self) -> BillCache:
+        return bill_cache
+
+    @cached_property
+    def flight(self) -> SingleFlight:
+        return SingleFlight("process_new_bills")
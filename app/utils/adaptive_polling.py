@@ -0,0 +1,108 @@
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from apscheduler.triggers.cron import CronTrigger
+from pytz import timezone
+
+from app.utils.file_utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_PATH = os.path.join(".cache", "poll_stats.json")
+
+
+class AdaptivePoller:
+    """
+    Chooses when to poll the billpacket next, based on how often its content has
+    actually changed at this time of day / day of week.
+
+    Each poll outcome is recorded in a (weekday, hour) bucket with exponential
+    decay, so the history keeps adapting. Right after a change the poller drops
+    to `min_interval`; otherwise the interval slides between `min_interval` and
+    `max_interval` with the bucket's smoothed change rate. Polls are only
+    scheduled inside the configured cron windows.
+    """
+
+    def __init__(
+        self,
+        windows: List[dict],
+        tz_name: str,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        burst_window: timedelta,
+        stats_path: Optional[str] = None,
+        decay: float = 0.98
+    ):
+        self.tz = timezone(tz_name)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.burst_window = burst_window
+        self.stats_path = stats_path or os.getenv("POLL_STATS_PATH", DEFAULT_STATS_PATH)
+        self.decay = decay
+        self._triggers = [self._coverage_trigger(window) for window in windows]
+        self._stats = self._load()
+
+    def _coverage_trigger(self, window: dict) -> CronTrigger:
+        # Drop the step from the minute field so the trigger fires on every minute of the window
+        fields = {key: value for key, value in window.items() if key != "second"}
+        fields["minute"] = str(fields.get("minute", "*")).split("/")[0] or "*"
+        return CronTrigger(timezone=self.tz, **fields)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.stats_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable poll stats {self.stats_path}: {e}")
+        return {"buckets": {}, "last_change_at": None}
+
+    def _save(self):
+        try:
+            atomic_write(self.stats_path, json.dumps(self._stats))
+        except OSError as e:
+            logger.warning(f"Could not save poll stats {self.stats_path}: {e}")
+
+    def _bucket_key(self, when: datetime) -> str:
+        local = when.astimezone(self.tz)
+        return f"{local.weekday()}-{local.hour}"
+
+    def record(self, when: datetime, changed: bool):
+        key = self._bucket_key(when)
+        bucket = self._stats["buckets"].setdefault(key, {"polls": 0.0, "changes": 0.0})
+        bucket["polls"] = bucket["polls"] * self.decay + 1
+        bucket["changes"] = bucket["changes"] * self.decay + (1 if changed else 0)
+        if changed:
+            self._stats["last_change_at"] = when.timestamp()
+        self._save()
+
+    def change_rate(self, when: datetime) -> float:
+        bucket = self._stats["buckets"].get(self._bucket_key(when), {"polls": 0.0, "changes": 0.0})
+        # Laplace smoothing: an unseen bucket starts halfway between min and max
+        return (bucket["changes"] + 1) / (bucket["polls"] + 2)
+
+    def next_interval(self, now: datetime) -> timedelta:
+        last_change_at = self._stats.get("last_change_at")
+        if last_change_at is not None and now.timestamp() - last_change_at <= self.burst_window.total_seconds():
+            return self.min_interval
+        rate = self.change_rate(now)
+        return self.max_interval - (self.max_interval - self.min_interval) * rate
+
+    def in_window(self, when: datetime) -> bool:
+        minute = when.astimezone(self.tz).replace(second=0, microsecond=0)
+        return any(trigger.get_next_fire_time(None, minute) == minute for trigger in self._triggers)
+
+    def next_window_start(self, when: datetime) -> Optional[datetime]:
+        fire_times = [trigger.get_next_fire_time(None, when) for trigger in self._triggers]
+        fire_times = [fire_time for fire_time in fire_times if fire_time is not None]
+        return min(fire_times) if fire_times else None
+
+    def next_poll_time(self, now: datetime) -> Optional[datetime]:
+        candidate = now + self.next_interval(now)
+        if self.in_window(candidate):
+            return candidate
+        return self.next_window_start(candidate)
@@ -0,0 +1,86 @@
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from app.utils.file_utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "bill_html")
+
+
+@dataclass
+class CachedBill:
+    bill_number: str
+    content_hash: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class BillCache:
+    """
+    Persistent on-disk record of the last fetch of each bill attachment, keyed
+    by bill number: a <bill_number>.json file holding the ETag, Last-Modified and
+    SHA-256 of the body, so the next fetch can be made conditional. The body
+    itself lives in the bill text store under that hash.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or os.getenv("BILL_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+    def _path(self, bill_number: str) -> str:
+        return os.path.join(self.cache_dir, f"{bill_number}.json")
+
+    def get(self, bill_number: str) -> Optional[CachedBill]:
+        path = self._path(bill_number)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            return CachedBill(
+                bill_number=bill_number,
+                content_hash=meta["content_hash"],
+                etag=meta.get("etag"),
+                last_modified=meta.get("last_modified")
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable cache entry for bill {bill_number}: {e}")
+            self.delete(bill_number)
+            return None
+
+    def put(self, bill_number: str, content_hash: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> CachedBill:
+        entry = CachedBill(
+            bill_number=bill_number,
+            content_hash=content_hash,
+            etag=etag,
+            last_modified=last_modified
+        )
+        try:
+            atomic_write(self._path(bill_number), json.dumps(asdict(entry)))
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for bill {bill_number}: {e}")
+        return entry
+
+    def delete(self, bill_number: str):
+        try:
+            os.remove(self._path(bill_number))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CachedBill]) -> dict:
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+
+bill_cache = BillCache()
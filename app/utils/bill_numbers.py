@@ -0,0 +1,147 @@
+import re
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+# "HF 207", "H.F. 207", "hf207", "SSB1040", "HJR 3"
+BILL_NUMBER_RE = re.compile(r"^([A-Z])([A-Z]*)(\d+)$")
+_SEPARATORS_RE = re.compile(r"[\s.]+")
+_RANGE_RE = re.compile(r"^([A-Z]+\d+)\s*[-–]\s*([A-Z]*)(\d+)$")
+
+
+class BillNumber(NamedTuple):
+    """
+    Parsed bill identifier. Orders by chamber, then bill type, then number, so
+    HF2 sorts before HF10 and all House bills before Senate bills.
+    """
+    chamber: str
+    kind: str
+    number: int
+
+    @property
+    def prefix(self) -> str:
+        return f"{self.chamber}{self.kind}"
+
+    def __str__(self) -> str:
+        return f"{self.prefix}{self.number}"
+
+
+@dataclass(frozen=True, order=True)
+class BillRange:
+    """
+    A run of consecutive bill numbers sharing a prefix, e.g. HF1-HF250
+    """
+    prefix: str
+    first: int
+    last: int
+
+    def __contains__(self, bill_number) -> bool:
+        bill_number = parse_bill_number(bill_number) if isinstance(bill_number, str) else bill_number
+        return bill_number.prefix == self.prefix and self.first <= bill_number.number <= self.last
+
+    def __len__(self) -> int:
+        return self.last - self.first + 1
+
+    def __iter__(self) -> Iterator[BillNumber]:
+        chamber, kind = self.prefix[0], self.prefix[1:]
+        return (BillNumber(chamber, kind, number) for number in range(self.first, self.last + 1))
+
+    def __str__(self) -> str:
+        if self.first == self.last:
+            return f"{self.prefix}{self.first}"
+        return f"{self.prefix}{self.first}-{self.prefix}{self.last}"
+
+
+def parse_bill_number(text: str) -> BillNumber:
+    """
+    Parse a bill number as written on the billpacket or by hand. Spaces, dots
+    and case are ignored. Raises ValueError if it isn't a prefix followed by a
+    number.
+    """
+    match = BILL_NUMBER_RE.match(_SEPARATORS_RE.sub("", text).upper())
+    if match is None:
+        raise ValueError(f"Not a bill number: {text!r}")
+    chamber, kind, number = match.groups()
+    return BillNumber(chamber, kind, int(number))
+
+
+def normalize_bill_number(text: str) -> str:
+    """
+    Canonical form of a bill number (HF207), or the text with whitespace removed
+    if it doesn't parse.
+    """
+    try:
+        return str(parse_bill_number(text))
+    except ValueError:
+        return _SEPARATORS_RE.sub("", text)
+
+
+def bill_prefix(text: str) -> str:
+    """
+    Letter prefix of a bill number (HF, SF, HSB, SSB, HJR, ...), or "" if it doesn't parse
+    """
+    try:
+        return parse_bill_number(text).prefix
+    except ValueError:
+        return ""
+
+
+def bill_sort_key(text: str) -> Tuple[int, Union[BillNumber, str]]:
+    """
+    Sort key for bill number strings in natural order; unparseable ones sort last.
+    """
+    try:
+        return 0, parse_bill_number(text)
+    except ValueError:
+        return 1, text
+
+
+def compress_bill_numbers(bill_numbers: Iterable[Union[str, BillNumber]]) -> List[BillRange]:
+    """
+    Collapse bill numbers into sorted runs of consecutive numbers per prefix, so
+    {HF1, HF2, HF3, HF5, SF2} becomes [HF1-HF3, HF5, SF2]. Duplicates are ignored;
+    strings that don't parse raise ValueError.
+    """
+    parsed = sorted({parse_bill_number(b) if isinstance(b, str) else b for b in bill_numbers})
+    ranges = []
+    for prefix, numbers in groupby(parsed, key=lambda bill_number: bill_number.prefix):
+        # Consecutive numbers share the same (number - position) offset
+        for _, run in groupby(enumerate(b.number for b in numbers), key=lambda item: item[1] - item[0]):
+            run = [number for _, number in run]
+            ranges.append(BillRange(prefix, run[0], run[-1]))
+    return ranges
+
+
+def format_bill_ranges(bill_numbers: Iterable[Union[str, BillNumber]]) -> str:
+    """
+    Compact text form of a set of bill numbers: "HF1-HF3, HF5, SF2". Strings
+    that don't parse are listed after the ranges as they are.
+    """
+    parsed, unparsed = [], set()
+    for bill_number in bill_numbers:
+        try:
+            parsed.append(parse_bill_number(bill_number) if isinstance(bill_number, str) else bill_number)
+        except ValueError:
+            unparsed.add(bill_number)
+    return ", ".join([str(bill_range) for bill_range in compress_bill_numbers(parsed)] + sorted(unparsed))
+
+
+def parse_bill_ranges(text: str) -> List[BillRange]:
+    """
+    Inverse of format_bill_ranges. Range ends may omit the prefix ("HF1-250").
+    """
+    ranges = []
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        match = _RANGE_RE.match(_SEPARATORS_RE.sub("", part).upper())
+        if match is None:
+            bill_number = parse_bill_number(part)
+            ranges.append(BillRange(bill_number.prefix, bill_number.number, bill_number.number))
+            continue
+        first = parse_bill_number(match.group(1))
+        if match.group(2) and match.group(2) != first.prefix:
+            raise ValueError(f"Range {part!r} spans different bill types")
+        last = int(match.group(3))
+        if last < first.number:
+            raise ValueError(f"Range {part!r} ends before it starts")
+        ranges.append(BillRange(first.prefix, first.number, last))
+    return ranges
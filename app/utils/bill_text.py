@@ -0,0 +1,40 @@
+import hashlib
+import html
+import re
+
+_NON_CONTENT_RE = re.compile(r"<!--.*?-->|<(script|style|head)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+# Struck and underlined text is how amendments mark removed and added words, so
+# those tags are kept as wdiff-style markers instead of being stripped
+_AMENDMENT_MARKERS = [
+    (re.compile(r"<(?:s|strike|del)\b[^>]*>", re.IGNORECASE), " [- "),
+    (re.compile(r"</(?:s|strike|del)\s*>", re.IGNORECASE), " -] "),
+    (re.compile(r"<(?:u|ins)\b[^>]*>", re.IGNORECASE), " {+ "),
+    (re.compile(r"</(?:u|ins)\s*>", re.IGNORECASE), " +} "),
+]
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_bill_text(content: bytes) -> str:
+    """
+    Reduce a bill attachment to its visible text: comments, scripts, styles and
+    the document head are dropped, strike/underline markup becomes [- -] and
+    {+ +} markers, other tags are stripped, entities decoded and whitespace
+    collapsed. Republishing an unchanged bill with different markup normalizes
+    to the same text; an amendment, or swapping struck and underlined words,
+    does not.
+    """
+    text = content.decode("utf-8", errors="replace")
+    text = _NON_CONTENT_RE.sub(" ", text)
+    for pattern, marker in _AMENDMENT_MARKERS:
+        text = pattern.sub(marker, text)
+    text = _TAG_RE.sub(" ", text)
+    text = html.unescape(text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def text_hash(content: bytes) -> str:
+    """
+    SHA-256 of the normalized bill text, the counterpart of LegiscanBillText.text_hash.
+    """
+    return hashlib.sha256(normalize_bill_text(content).encode()).hexdigest()
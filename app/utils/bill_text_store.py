@@ -0,0 +1,377 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Sequence
+
+from app.utils.file_utils import atomic_write
+from app.utils.sqlite_utils import SQLiteConnector
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional, gzip is the fallback
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = os.path.join(".cache", "bill_text")
+
+CODEC_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz", "raw": ""}
+
+
+@dataclass
+class StoredVersion:
+    state_code: str
+    session_id: int
+    bill_number: str
+    kind: str
+    version: int
+    content_hash: str
+    size: int
+    stored_at: float
+    text_hash: Optional[str] = None
+
+
+class BillTextStore:
+    """
+    Content-addressed store for fetched bill HTML and converted markdown.
+
+    Blobs are compressed (zstd when installed, otherwise gzip) and written once
+    under objects/<hash[:2]>/<hash>, keyed by the SHA-256 of the uncompressed
+    content, so identical text across versions or re-scrapes is stored once.
+    A SQLite index maps (state, session, bill_number, kind, version) to a hash,
+    and records bill updates (e.g. text changes) in the shape of BillUpdate.
+    """
+
+    def __init__(self, root: Optional[str] = None, codec: Optional[str] = None):
+        self.root = root or os.getenv("BILL_TEXT_STORE_DIR", DEFAULT_STORE_DIR)
+        codec = codec or os.getenv("BILL_TEXT_STORE_CODEC") or ("zstd" if zstandard is not None else "gzip")
+        if codec == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, storing bill text with gzip")
+            codec = "gzip"
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown bill text store codec: {codec}")
+        self.codec = codec
+        self._db = SQLiteConnector(self._create_schema)
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.root, "index.sqlite3")
+
+    def _connect(self) -> sqlite3.Connection:
+        return self._db.connect(self.index_path)
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                content_hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS versions (
+                state_code TEXT NOT NULL,
+                session_id INTEGER NOT NULL,
+                bill_number TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                text_hash TEXT,
+                checked_at REAL,
+                PRIMARY KEY (state_code, session_id, bill_number, kind, version)
+            )
+            """
+        )
+        # Indexes created before text change tracking lack these columns
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(versions)")}
+        for column, column_type in (("text_hash", "TEXT"), ("checked_at", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE versions ADD COLUMN {column} {column_type}")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS conversions (
+                source_hash TEXT NOT NULL,
+                converter TEXT NOT NULL,
+                result_hash TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (source_hash, converter)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bill_updates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                state_code TEXT NOT NULL,
+                session_id INTEGER NOT NULL,
+                bill_number TEXT NOT NULL,
+                update_type TEXT NOT NULL,
+                meta_data TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def _blob_path(self, content_hash: str, codec: str) -> str:
+        return os.path.join(self.root, "objects", content_hash[:2], content_hash + CODEC_EXTENSIONS[codec])
+
+    def _compress(self, content: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(content)
+        if self.codec == "gzip":
+            return gzip.compress(content, compresslevel=6, mtime=0)
+        return content
+
+    def put_blob(self, content: bytes, conn: Optional[sqlite3.Connection] = None) -> str:
+        """
+        Store `content` if it isn't stored yet and return its hash.
+        """
+        content_hash = self.hash_content(content)
+        own_conn = conn is None
+        conn = conn or self._connect()
+        try:
+            if conn.execute("SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone():
+                return content_hash
+            data = self._compress(content)
+            atomic_write(self._blob_path(content_hash, self.codec), data)
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO blobs (content_hash, codec, size, stored_size) VALUES (?, ?, ?, ?)",
+                    (content_hash, self.codec, len(content), len(data))
+                )
+            return content_hash
+        finally:
+            if own_conn:
+                conn.close()
+
+    def put(self, state_code: str, session_id: int, bill_number: str, content: bytes,
+            kind: str = "html", version: Optional[int] = None, text_hash: Optional[str] = None) -> StoredVersion:
+        """
+        Store a bill's content and index it as `version`. Without an explicit
+        version, the content becomes the next version unless it matches the
+        latest one, in which case the latest version is returned unchanged.
+        When `text_hash` (a hash of the normalized text) is given, versions are
+        compared on it rather than on the raw bytes.
+        """
+        conn = self._connect()
+        try:
+            now = time.time()
+            if version is None:
+                latest = self._latest(conn, state_code, session_id, bill_number, kind)
+                if latest is not None and self._same_text(latest, self.hash_content(content), text_hash):
+                    with conn:
+                        conn.execute(
+                            """
+                            UPDATE versions SET checked_at = ?
+                            WHERE state_code = ? AND session_id = ? AND bill_number = ? AND kind = ? AND version = ?
+                            """,
+                            (now, state_code, session_id, bill_number, kind, latest.version)
+                        )
+                    return latest
+                version = latest.version + 1 if latest is not None else 1
+            content_hash = self.put_blob(content, conn)
+            with conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO versions
+                        (state_code, session_id, bill_number, kind, version, content_hash, stored_at, text_hash,
+                         checked_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (state_code, session_id, bill_number, kind, version, content_hash, now, text_hash, now)
+                )
+            return StoredVersion(state_code, session_id, bill_number, kind, version, content_hash,
+                                 len(content), now, text_hash)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _same_text(latest: StoredVersion, content_hash: str, text_hash: Optional[str]) -> bool:
+        if text_hash is not None and latest.text_hash is not None:
+            return latest.text_hash == text_hash
+        return latest.content_hash == content_hash
+
+    def _latest(self, conn: sqlite3.Connection, state_code: str, session_id: int, bill_number: str,
+                kind: str) -> Optional[StoredVersion]:
+        versions = self._versions(conn, state_code, session_id, bill_number, kind, latest_only=True)
+        return versions[0] if versions else None
+
+    @staticmethod
+    def _versions(conn: sqlite3.Connection, state_code: str, session_id: int, bill_number: str, kind: str,
+                  latest_only: bool = False) -> List[StoredVersion]:
+        query = """
+            SELECT v.version, v.content_hash, b.size, v.stored_at, v.text_hash
+            FROM versions v JOIN blobs b ON b.content_hash = v.content_hash
+            WHERE v.state_code = ? AND v.session_id = ? AND v.bill_number = ? AND v.kind = ?
+            ORDER BY v.version DESC
+        """
+        if latest_only:
+            query += " LIMIT 1"
+        rows = conn.execute(query, (state_code, session_id, bill_number, kind)).fetchall()
+        return [
+            StoredVersion(state_code, session_id, bill_number, kind, version, content_hash, size, stored_at, text_hash)
+            for version, content_hash, size, stored_at, text_hash in rows
+        ]
+
+    def get(self, state_code: str, session_id: int, bill_number: str, kind: str = "html",
+            version: Optional[int] = None) -> Optional[StoredVersion]:
+        """
+        Look up a stored version (the latest by default) without reading its content.
+        """
+        conn = self._connect()
+        try:
+            versions = self._versions(conn, state_code, session_id, bill_number, kind)
+        finally:
+            conn.close()
+        if version is None:
+            return versions[0] if versions else None
+        return next((stored for stored in versions if stored.version == version), None)
+
+    def history(self, state_code: str, session_id: int, bill_number: str, kind: str = "html") -> List[StoredVersion]:
+        conn = self._connect()
+        try:
+            return list(reversed(self._versions(conn, state_code, session_id, bill_number, kind)))
+        finally:
+            conn.close()
+
+    def get_conversion(self, source_hash: str, converter: str) -> Optional[bytes]:
+        """
+        The stored output of `converter` (e.g. HTML to markdown) for the blob
+        with `source_hash`, if it has been converted before.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT result_hash FROM conversions WHERE source_hash = ? AND converter = ?",
+                (source_hash, converter)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        try:
+            return self.read(row[0])
+        except (KeyError, OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable {converter} conversion of {source_hash}: {e}")
+            return None
+
+    def put_conversion(self, source_hash: str, converter: str, result: bytes) -> str:
+        conn = self._connect()
+        try:
+            result_hash = self.put_blob(result, conn)
+            with conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO conversions (source_hash, converter, result_hash, created_at)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (source_hash, converter, result_hash, time.time())
+                )
+            return result_hash
+        finally:
+            conn.close()
+
+    def least_recently_checked(self, state_code: str, session_id: int, limit: int, kind: str = "html",
+                               exclude: Sequence[str] = ()) -> List[str]:
+        """
+        Bill numbers whose latest stored version was compared against a fresh
+        fetch longest ago, for spreading re-checks of unchanged rows over runs.
+        """
+        if limit <= 0:
+            return []
+        exclude = set(exclude)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """
+                SELECT bill_number, MAX(COALESCE(checked_at, stored_at)) AS last_checked
+                FROM versions WHERE state_code = ? AND session_id = ? AND kind = ?
+                GROUP BY bill_number ORDER BY last_checked ASC
+                """,
+                (state_code, session_id, kind)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [bill_number for bill_number, _ in rows if bill_number not in exclude][:limit]
+
+    def record_update(self, state_code: str, session_id: int, bill_number: str, update_type: str,
+                      meta_data: dict):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO bill_updates (state_code, session_id, bill_number, update_type, meta_data, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (state_code, session_id, bill_number, update_type, json.dumps(meta_data), time.time())
+                )
+        finally:
+            conn.close()
+
+    def updates(self, state_code: str, session_id: int, since: Optional[float] = None) -> List[dict]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """
+                SELECT bill_number, update_type, meta_data, created_at FROM bill_updates
+                WHERE state_code = ? AND session_id = ? AND created_at >= ?
+                ORDER BY created_at
+                """,
+                (state_code, session_id, since or 0)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {"bill_number": bill_number, "update_type": update_type, "created_at": created_at,
+             **json.loads(meta_data or "{}")}
+            for bill_number, update_type, meta_data, created_at in rows
+        ]
+
+    def open(self, content_hash: str) -> BinaryIO:
+        """
+        Open a blob for streaming, decompressing lazily as it is read. Blobs
+        stored with the raw codec are returned as plain files, which callers
+        can memory-map.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT codec FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            raise KeyError(content_hash)
+        codec = row[0]
+        path = self._blob_path(content_hash, codec)
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError(f"Blob {content_hash} is zstd-compressed but zstandard is not installed")
+            return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        if codec == "gzip":
+            return gzip.open(path, "rb")
+        return open(path, "rb")
+
+    def read(self, content_hash: str) -> bytes:
+        with self.open(content_hash) as f:
+            content = f.read()
+        if self.hash_content(content) != content_hash:
+            raise ValueError(f"Blob {content_hash} failed hash check")
+        return content
+
+
+bill_text_store = BillTextStore()
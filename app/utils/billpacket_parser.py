@@ -0,0 +1,86 @@
+import logging
+from typing import List, NamedTuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from app.utils.bill_numbers import normalize_bill_number
+
+try:
+    import lxml.html
+except ImportError:  # pragma: no cover - lxml is optional, BeautifulSoup is the fallback
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+BILL_TABLE_CLASS = "standard sortable divideVert"
+STATE_LINK_TEMPLATE = "https://www.legis.iowa.gov/legislation/BillBook?ba={bill_number}&ga=91"
+
+
+class BillpacketRow(NamedTuple):
+    bill_number: str
+    bill_title: str
+    state_link: str
+
+
+def parse_billpacket(content: str, state_link_template: str = STATE_LINK_TEMPLATE) -> List[BillpacketRow]:
+    """
+    Extract bill rows from the "standard sortable divideVert" tables (both
+    "Bills Filed" and "Study Bills Filed") of the billpacket page.
+    Uses lxml when it is installed, otherwise a SoupStrainer-restricted parse.
+    """
+    if lxml is not None:
+        try:
+            return parse_billpacket_lxml(content, state_link_template)
+        except ValueError as e:
+            # e.g. an XML encoding declaration in a decoded str; the soup path handles it
+            logger.warning(f"lxml could not parse billpacket page, falling back to BeautifulSoup: {e}")
+    return parse_billpacket_soup(content, state_link_template)
+
+
+def parse_billpacket_lxml(content: str, state_link_template: str = STATE_LINK_TEMPLATE) -> List[BillpacketRow]:
+    if not content.strip():
+        return []
+    document = lxml.html.fromstring(content)
+    rows = []
+    for table in document.xpath("//table[normalize-space(@class)=$cls]", cls=BILL_TABLE_CLASS):
+        for row in table.iter("tr"):
+            if next(row.iter("th"), None) is not None:
+                continue
+            cells = list(row.iter("td"))
+            if len(cells) < 2:
+                continue
+            a_tag = next(cells[0].iter("a"), None)
+            if a_tag is None:
+                continue
+            bill_number = normalize_bill_number(a_tag.text_content())
+            bill_title = " ".join(text.strip() for text in cells[1].itertext() if text.strip())
+            rows.append(BillpacketRow(bill_number, bill_title, state_link_template.format(bill_number=bill_number)))
+    return rows
+
+
+def parse_billpacket_soup(content: str, state_link_template: str = STATE_LINK_TEMPLATE,
+                          restrict: bool = True) -> List[BillpacketRow]:
+    """
+    BeautifulSoup implementation. With `restrict=False` the whole page is parsed,
+    which is the original (slow) behaviour, kept for benchmarking and comparison.
+    """
+    parse_only = SoupStrainer("table", class_=BILL_TABLE_CLASS) if restrict else None
+    soup = BeautifulSoup(content, "html.parser", parse_only=parse_only)
+    rows = []
+    for table in soup.find_all("table", class_=BILL_TABLE_CLASS):
+        # Loop over the table rows (skip rows containing header cells)
+        for row in table.find_all("tr"):
+            if row.find("th"):
+                continue
+            cells = row.find_all("td")
+            if len(cells) < 2:
+                continue
+            # Extract bill number from the first column (from the <a> tag)
+            a_tag = cells[0].find("a")
+            if not a_tag:
+                continue
+            bill_number = normalize_bill_number(a_tag.text)
+            # Extract the bill title from the second column
+            bill_title = cells[1].get_text(separator=" ", strip=True)
+            rows.append(BillpacketRow(bill_number, bill_title, state_link_template.format(bill_number=bill_number)))
+    return rows
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app.utils.billpacket_parser import BillpacketRow
+from app.utils.file_utils import atomic_write
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(".cache", "billpacket_snapshot.json")
+# Rows listed before their attachment is published (404) are re-tried after a
+# doubling delay, starting at UNPUBLISHED_RETRY_SECONDS and capped at the max
+UNPUBLISHED_RETRY_SECONDS = float(os.getenv("UNPUBLISHED_RETRY_SECONDS", "600"))
+UNPUBLISHED_RETRY_MAX_SECONDS = float(os.getenv("UNPUBLISHED_RETRY_MAX_SECONDS", "21600"))
+
+
+@dataclass
+class BillpacketDelta:
+    added: List[BillpacketRow] = field(default_factory=list)
+    retitled: List[BillpacketRow] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Rows whose fetch or submission failed last run, unchanged in the listing since
+    retrying: List[BillpacketRow] = field(default_factory=list)
+    # Unpublished rows whose next retry isn't due yet
+    waiting: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed_rows(self) -> List[BillpacketRow]:
+        return self.added + self.retitled + self.retrying
+
+    @property
+    def listing_changed(self) -> bool:
+        """
+        Whether the billpacket itself gained or retitled rows; retries don't count
+        """
+        return bool(self.added or self.retitled)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.retitled or self.removed or self.retrying)
+
+
+class BillpacketSnapshot:
+    """
+    Persisted copy of the last billpacket row set: bill number -> title, row hash
+    and first-seen time. Diffing a fresh parse against it yields the rows that
+    were added, retitled or removed since the last successful run.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("BILLPACKET_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+
+    @staticmethod
+    def row_hash(row: Sequence[str]) -> str:
+        return hashlib.sha256("\x1f".join(row).encode()).hexdigest()
+
+    def load(self) -> Optional[Dict[str, dict]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)["rows"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable billpacket snapshot {self.path}: {e}")
+            return None
+
+    def diff(self, rows: Iterable[BillpacketRow], previous: Optional[Dict[str, dict]] = None) -> BillpacketDelta:
+        if previous is None:
+            previous = self.load() or {}
+        delta = BillpacketDelta()
+        now = time.time()
+        seen = set()
+        for row in rows:
+            bill_number = row[0]
+            seen.add(bill_number)
+            entry = previous.get(bill_number)
+            if entry is None:
+                delta.added.append(row)
+            elif entry["row_hash"] != self.row_hash(row):
+                delta.retitled.append(row)
+            elif entry.get("retry_at", 0) > now:
+                delta.waiting.append(bill_number)
+            elif entry.get("retry"):
+                delta.retrying.append(row)
+            else:
+                delta.unchanged += 1
+        delta.removed = [bill_number for bill_number in previous if bill_number not in seen]
+        return delta
+
+    def save(self, rows: Iterable[BillpacketRow], previous: Optional[Dict[str, dict]] = None,
+             skip: Iterable[str] = (), unpublished: Iterable[str] = (), waiting: Iterable[str] = ()):
+        """
+        Persist `rows` as the new snapshot. Bill numbers in `skip` (e.g. rows whose
+        fetch or submission failed) are flagged for retry, so the next run picks
+        them up again without counting them as billpacket changes. `unpublished`
+        rows (attachment not found yet) are retried after a growing delay, and
+        `waiting` rows that weren't due this run keep their previous entry.
+        """
+        previous = previous or {}
+        skip, unpublished, waiting = set(skip), set(unpublished), set(waiting)
+        now = time.time()
+        snapshot = {}
+        for row in rows:
+            bill_number, title = row[0], row[1]
+            old = previous.get(bill_number)
+            if bill_number in waiting and old is not None:
+                snapshot[bill_number] = old
+                continue
+            entry = snapshot[bill_number] = {
+                "title": title,
+                "row_hash": self.row_hash(row),
+                "first_seen": old["first_seen"] if old else now
+            }
+            if bill_number in unpublished:
+                attempts = (old or {}).get("unpublished_attempts", 0) + 1
+                delay = min(UNPUBLISHED_RETRY_SECONDS * 2 ** (attempts - 1), UNPUBLISHED_RETRY_MAX_SECONDS)
+                entry.update(retry=True, unpublished_attempts=attempts, retry_at=now + delay)
+            elif bill_number in skip:
+                entry["retry"] = True
+        try:
+            atomic_write(self.path, json.dumps({"saved_at": now, "rows": snapshot}))
+        except OSError as e:
+            logger.warning(f"Could not save billpacket snapshot {self.path}: {e}")
+
+
+billpacket_snapshot = BillpacketSnapshot()
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+async def settle_future(future: asyncio.Future, work: Awaitable[T]) -> T:
+    """
+    Await `work` and settle `future` with its outcome (result, exception or
+    cancellation) so every caller joined on the future sees the same thing.
+    The outcome is also returned or raised here.
+    """
+    try:
+        result = await work
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody joined
+            future.exception()
+        raise
+    future.set_result(result)
+    return result
+
+
+class Coalescer:
+    """
+    One in-flight computation per key: concurrent callers asking for the same key
+    while it runs await that computation instead of starting their own.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable[T]]) -> T:
+        current = self._inflight.get(key)
+        if current is not None:
+            # Shielded so one joined caller being cancelled doesn't cancel the others
+            return await asyncio.shield(current)
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            return await settle_future(future, work())
+        finally:
+            self._inflight.pop(key, None)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+FetchJob = Tuple[Hashable, str, Callable[[], Awaitable[Any]]]
+
+
+class TokenBucket:
+    """
+    Simple token bucket: refills at `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class FetchScheduler:
+    """
+    Runs HTTP fetches with a max-in-flight limit, a token-bucket rate per host,
+    a per-request timeout and jittered exponential retry on transient failures.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        rate_per_host: float = 4.0,
+        burst: Optional[float] = None,
+        request_timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0
+    ):
+        self.max_in_flight = max_in_flight
+        self.rate_per_host = rate_per_host
+        self.burst = burst if burst is not None else max(1.0, rate_per_host)
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).hostname or ""
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._buckets[host]
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in RETRYABLE_STATUSES
+        return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if isinstance(error, aiohttp.ClientResponseError) and error.headers:
+            retry_after = error.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+        return delay
+
+    async def run(self, url: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a single fetch under the scheduler's limits, retrying transient errors.
+        The final error is re-raised once retries are exhausted.
+        """
+        bucket = self._bucket(url)
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                await bucket.acquire()
+                try:
+                    return await asyncio.wait_for(fetch(), timeout=self.request_timeout)
+                except Exception as e:
+                    if attempt >= self.max_retries or not self.is_retryable(e):
+                        raise
+                    error = e
+            # Back off outside the semaphore so waiting retries don't hold a slot
+            delay = self._backoff(attempt, error)
+            attempt += 1
+            logger.warning(f"Retrying {url} in {delay:.2f}s (attempt {attempt}/{self.max_retries}): {type(error).__name__} {error}")
+            await asyncio.sleep(delay)
+
+    async def as_completed(self, jobs: Iterable[FetchJob]) -> AsyncIterator[Tuple[Hashable, Any]]:
+        """
+        Yield (key, result) pairs as each job finishes. A job that fails after all
+        retries yields its exception as the result instead of aborting the batch.
+        Only a bounded window of jobs is scheduled at any one time.
+        """
+        async def _run(key: Hashable, url: str, fetch: Callable[[], Awaitable[Any]]):
+            try:
+                return key, await self.run(url, fetch)
+            except Exception as e:
+                return key, e
+
+        jobs_iter = iter(jobs)
+        window = self.max_in_flight * 2
+        pending = set()
+        try:
+            for job in jobs_iter:
+                pending.add(asyncio.ensure_future(_run(*job)))
+                if len(pending) >= window:
+                    break
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+                for job in jobs_iter:
+                    pending.add(asyncio.ensure_future(_run(*job)))
+                    if len(pending) >= window:
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,27 @@
+import os
+import threading
+from typing import Union
+
+
+def atomic_write(path: str, data: Union[bytes, str]):
+    """
+    Write `data` (str is written as UTF-8) to `path` through a temp file and a
+    rename, so readers see the old file or the complete new one, never a partial
+    write. The parent directory is created if needed.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "20"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+
+
+class HttpClientRegistry:
+    """
+    Process-wide registry holding one pooled aiohttp.ClientSession per upstream
+    host, so DNS lookups, TLS handshakes and keep-alive connections are reused
+    across scrape, check, submit, convert and Slack calls.
+
+    Sessions are created lazily and are bound to the event loop that created
+    them; use `lifespan()` (or `start()`/`close()`) around the work that uses them.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._host_limits: Dict[str, int] = {}
+        self._created: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def configure_host(self, host: str, limit: int):
+        """
+        Override the connection limit for one host. Takes effect the next time
+        that host's session is created.
+        """
+        self._host_limits[host] = limit
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._sessions:
+                logger.warning("HTTP client registry used from a new event loop, discarding old sessions")
+            self._sessions = {}
+            self._loop = loop
+
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._host_limits.get(host, HTTP_POOL_LIMIT),
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[host] = session
+            self._created[host] = self._created.get(host, 0) + 1
+            logger.info(f"Created pooled HTTP session for {host}")
+        return session
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    async def close(self):
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            await session.close()
+        self._loop = None
+
+    @asynccontextmanager
+    async def lifespan(self):
+        await self.start()
+        try:
+            yield self
+        finally:
+            await self.close()
+
+    def stats(self) -> dict:
+        stats = {}
+        for host, session in self._sessions.items():
+            connector = session.connector
+            stats[host] = {
+                "limit": connector.limit if connector else None,
+                "in_use": len(getattr(connector, "_acquired", ())),
+                "idle": sum(len(conns) for conns in getattr(connector, "_conns", {}).values()),
+                "sessions_created": self._created.get(host, 0),
+                "closed": session.closed
+            }
+        return stats
+
+
+http_clients = HttpClientRegistry()
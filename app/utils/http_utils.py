@@ -1,5 +1,8 @@
 import aiohttp
+import base64
+import json
 import logging
+from aiohttp.abc import AbstractStreamWriter
 
 logger = logging.getLogger(__name__)
 
@@ -21,4 +24,34 @@ def get_bill_headers(bill_number: str) -> dict:
         'sec-ch-ua': '"Google Chrome";v="131", "Chromium";v="131", "Not_A Brand";v="24"',
         'sec-ch-ua-mobile': '?1',
         'sec-ch-ua-platform': '"Android"'
-    }
\ No newline at end of file
+    }
+
+
+class Base64JsonPayload(aiohttp.payload.Payload):
+    """
+    JSON request body with one string field holding base64 of `raw`. The
+    encoding is streamed into the request a chunk at a time, so the full base64
+    text is never built in memory. `document` must contain `placeholder` as
+    the value to replace.
+    """
+
+    PLACEHOLDER = "__BASE64_CONTENT__"
+    # Multiple of 3 so each chunk encodes without padding
+    CHUNK_SIZE = 3 * 16 * 1024
+
+    def __init__(self, document: dict, raw: bytes, placeholder: str = PLACEHOLDER, **kwargs):
+        prefix, suffix = json.dumps(document).split(json.dumps(placeholder), 1)
+        self._prefix = f'{prefix}"'.encode()
+        self._suffix = f'"{suffix}'.encode()
+        self._raw = raw
+        super().__init__(raw, content_type="application/json", **kwargs)
+        self._size = len(self._prefix) + 4 * ((len(raw) + 2) // 3) + len(self._suffix)
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return (self._prefix + base64.b64encode(self._raw) + self._suffix).decode(encoding, errors)
+
+    async def write(self, writer: AbstractStreamWriter) -> None:
+        await writer.write(self._prefix)
+        for start in range(0, len(self._raw), self.CHUNK_SIZE):
+            await writer.write(base64.b64encode(self._raw[start:start + self.CHUNK_SIZE]))
+        await writer.write(self._suffix)
@@ -0,0 +1,131 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from typing import Optional, Tuple
+
+from app.utils.sqlite_utils import SQLiteConnector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(".cache", "jobs.sqlite3")
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class JobStore:
+    """
+    SQLite-backed job table shared by all uvicorn workers on the host, so any
+    worker can answer status requests for a job started by another one.
+    A job whose heartbeat is older than `heartbeat_timeout` is reported as "lost".
+    """
+
+    def __init__(self, db_path: Optional[str] = None, heartbeat_timeout: float = 120.0):
+        self.db_path = db_path or os.getenv("JOB_STORE_DB", DEFAULT_DB_PATH)
+        self.heartbeat_timeout = heartbeat_timeout
+        self._db = SQLiteConnector(self._create_schema, isolation_level=None)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = self._db.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT,
+                progress TEXT,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                heartbeat_at REAL NOT NULL
+            )
+            """
+        )
+
+    def create_or_get_active(self, kind: str, params: dict) -> Tuple[dict, bool]:
+        """
+        Return the live active job of this kind if there is one, otherwise create a
+        queued job. The check and insert run in one write transaction so two
+        workers can't both create a job. Returns (job, created).
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"""
+                    SELECT * FROM jobs
+                    WHERE kind = ? AND status IN ({",".join("?" * len(ACTIVE_STATUSES))}) AND heartbeat_at >= ?
+                    ORDER BY created_at DESC LIMIT 1
+                    """,
+                    (kind, *ACTIVE_STATUSES, time.time() - self.heartbeat_timeout)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("COMMIT")
+                    return self._to_dict(row), False
+                now = time.time()
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    """
+                    INSERT INTO jobs (id, kind, status, params, created_at, updated_at, heartbeat_at)
+                    VALUES (?, ?, 'queued', ?, ?, ?, ?)
+                    """,
+                    (job_id, kind, json.dumps(params), now, now, now)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return self.get(job_id), True
+        finally:
+            conn.close()
+
+    def update(self, job_id: str, status: Optional[str] = None, progress: Optional[dict] = None,
+               result: Optional[dict] = None, error: Optional[str] = None):
+        fields = {"updated_at": time.time(), "heartbeat_at": time.time()}
+        if status is not None:
+            fields["status"] = status
+        if progress is not None:
+            fields["progress"] = json.dumps(progress)
+        if result is not None:
+            fields["result"] = json.dumps(result)
+        if error is not None:
+            fields["error"] = error
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn = self._connect()
+        try:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+        finally:
+            conn.close()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        job = self._to_dict(row)
+        if job["status"] in ACTIVE_STATUSES and job["heartbeat_at"] < time.time() - self.heartbeat_timeout:
+            job["status"] = "lost"
+        return job
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        for name in ("params", "progress", "result"):
+            job[name] = json.loads(job[name]) if job[name] else None
+        return job
+
+
+job_store = JobStore(heartbeat_timeout=float(os.getenv("JOB_HEARTBEAT_TIMEOUT", "120")))
@@ -0,0 +1,107 @@
+import logging
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Optional
+
+from app.utils.sqlite_utils import SQLiteConnector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(".cache", "known_bills.sqlite3")
+
+
+class KnownBillsIndex:
+    """
+    Persistent index of bills already confirmed to exist in Upvote, keyed by
+    (state_code, session_id, bill_number). Entries older than `ttl_seconds`
+    are treated as unknown so they get revalidated against the API; a TTL of
+    0 keeps entries forever.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        self.db_path = db_path or os.getenv("KNOWN_BILLS_DB", DEFAULT_DB_PATH)
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("KNOWN_BILLS_TTL_HOURS", "0")) * 3600
+        self.ttl_seconds = ttl_seconds
+        self._db = SQLiteConnector(self._create_schema)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self._db.connect(self.db_path)
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS known_bills (
+                state_code TEXT NOT NULL,
+                session_id INTEGER NOT NULL,
+                bill_number TEXT NOT NULL,
+                source TEXT,
+                confirmed_at REAL NOT NULL,
+                PRIMARY KEY (state_code, session_id, bill_number)
+            )
+            """
+        )
+
+    def filter_unknown(self, state_code: str, session_id: int, bill_numbers: List[str]) -> List[str]:
+        """
+        Return the bill numbers that are not (or no longer validly) in the index,
+        preserving input order.
+        """
+        if not bill_numbers:
+            return []
+        try:
+            conn = self._connect()
+            try:
+                known = self._known(conn, state_code, session_id)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Known bills index unavailable, checking all bills: {e}")
+            return list(bill_numbers)
+        return [bill_number for bill_number in bill_numbers if bill_number not in known]
+
+    def _known(self, conn: sqlite3.Connection, state_code: str, session_id: int) -> set:
+        query = "SELECT bill_number FROM known_bills WHERE state_code = ? AND session_id = ?"
+        params = [state_code, session_id]
+        if self.ttl_seconds:
+            query += " AND confirmed_at >= ?"
+            params.append(time.time() - self.ttl_seconds)
+        return {row[0] for row in conn.execute(query, params)}
+
+    def add(self, state_code: str, session_id: int, bill_numbers: Iterable[str], source: str):
+        rows = [(state_code, session_id, bill_number, source, time.time()) for bill_number in bill_numbers]
+        if not rows:
+            return
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        """
+                        INSERT INTO known_bills (state_code, session_id, bill_number, source, confirmed_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (state_code, session_id, bill_number)
+                        DO UPDATE SET source = excluded.source, confirmed_at = excluded.confirmed_at
+                        """,
+                        rows
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not record {len(rows)} bills in known bills index: {e}")
+
+    def remove(self, state_code: str, session_id: int, bill_numbers: Iterable[str]):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "DELETE FROM known_bills WHERE state_code = ? AND session_id = ? AND bill_number = ?",
+                    [(state_code, session_id, bill_number) for bill_number in bill_numbers]
+                )
+        finally:
+            conn.close()
+
+
+known_bills = KnownBillsIndex()
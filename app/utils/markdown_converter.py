@@ -0,0 +1,188 @@
+import asyncio
+import atexit
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, Hashable, Optional, Tuple
+
+from bs4 import BeautifulSoup, Comment, Declaration, Doctype, NavigableString, ProcessingInstruction, Tag
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:  # pragma: no cover - lxml is optional, html.parser is the fallback
+    HTML_PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+# Bump when the output format changes so cached conversions are not reused
+CONVERTER_NAME = "local-v2"
+
+BLOCK_TAGS = {"p", "div", "li", "tr", "blockquote", "pre", "center", "h1", "h2", "h3", "h4", "h5", "h6"}
+# Tags that only group blocks; without block children they are treated as inline text
+CONTAINER_TAGS = {"body", "html", "table", "tbody", "thead", "ul", "ol", "section", "article", "span", "font"}
+SKIP_TAGS = {"script", "style", "head", "title", "meta", "link", "noscript"}
+STRIKE_TAGS = {"s", "strike", "del"}
+UNDERLINE_TAGS = {"u", "ins"}
+BOLD_TAGS = {"b", "strong"}
+ITALIC_TAGS = {"i", "em"}
+CELL_TAGS = {"td", "th"}
+
+SECTION_RE = re.compile(r"^(?:Section|Sec\.)\s+\d+[A-Z]?\.")
+DIVISION_RE = re.compile(r"^DIVISION\s+[IVXLC\d]+$")
+LINE_NUMBER_CLASS_RE = re.compile(r"line[-_ ]?(?:num|number|no)", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+# Newlines in the HTML source are just whitespace; only <br> breaks a line
+SOURCE_NEWLINE_RE = re.compile(r"\n+")
+
+
+def _inline(node) -> str:
+    if isinstance(node, (Comment, Declaration, Doctype, ProcessingInstruction)):
+        return ""
+    if isinstance(node, NavigableString):
+        return SOURCE_NEWLINE_RE.sub(" ", str(node))
+    if not isinstance(node, Tag) or node.name in SKIP_TAGS:
+        return ""
+    if node.name == "br":
+        return "\n"
+    text = "".join(_inline(child) for child in node.children)
+    if node.name in CELL_TAGS:
+        return f"{text} "
+    stripped = text.strip()
+    if not stripped:
+        return text
+    # Keep surrounding spaces outside the markers so the markdown stays valid
+    lead, trail = text[:len(text) - len(text.lstrip())], text[len(text.rstrip()):]
+    if node.name in STRIKE_TAGS:
+        return f"{lead}~~{stripped}~~{trail}"
+    if node.name in UNDERLINE_TAGS:
+        return f"{lead}<u>{stripped}</u>{trail}"
+    if node.name in BOLD_TAGS:
+        return f"{lead}**{stripped}**{trail}"
+    if node.name in ITALIC_TAGS:
+        return f"{lead}*{stripped}*{trail}"
+    return text
+
+
+def _line_number(block: Tag) -> Optional[str]:
+    marker = block.find(class_=LINE_NUMBER_CLASS_RE)
+    if marker is None:
+        return None
+    number = marker.get_text(strip=True)
+    marker.extract()
+    return number if number.isdigit() else None
+
+
+def _is_block(node) -> bool:
+    if not isinstance(node, Tag):
+        return False
+    return node.name in BLOCK_TAGS or (node.name in CONTAINER_TAGS and node.find(BLOCK_TAGS) is not None)
+
+
+def _loose_text(nodes: list):
+    # Text and inline tags between blocks (or in a body without any) become a paragraph of their own
+    if not any(_inline(node).strip() for node in nodes):
+        return
+    paragraph = Tag(name="p")
+    for node in nodes:
+        paragraph.append(node.extract())
+    yield paragraph
+
+
+def _blocks(root: Tag):
+    run = []
+    for node in list(root.children):
+        if isinstance(node, Tag) and node.name in SKIP_TAGS:
+            continue
+        if not _is_block(node):
+            run.append(node)
+            continue
+        yield from _loose_text(run)
+        run = []
+        if node.find(BLOCK_TAGS):
+            yield from _blocks(node)
+        else:
+            yield node
+    yield from _loose_text(run)
+
+
+def convert_bill_html(content: bytes) -> str:
+    """
+    Convert an Iowa bill attachment to markdown: headings and section/division
+    headers become markdown headings, struck language becomes ~~text~~,
+    underlined (new) language becomes <u>text</u>, and line numbers are kept as
+    a "N " prefix on the lines that carry them (after the marker on headings).
+    """
+    soup = BeautifulSoup(content, HTML_PARSER)
+    root = soup.body or soup
+    lines = []
+    for block in _blocks(root):
+        number = _line_number(block)
+        text = WHITESPACE_RE.sub(" ", _inline(block))
+        for line in (part.strip() for part in text.split("\n")):
+            if not line:
+                continue
+            heading = ""
+            if block.name in {"h1", "h2", "h3", "h4", "h5", "h6"}:
+                heading = f"{'#' * int(block.name[1])} "
+            elif DIVISION_RE.match(line):
+                heading = "## "
+            elif SECTION_RE.match(line):
+                section = SECTION_RE.match(line).group(0)
+                rest = line[len(section):].strip()
+                lines.append(f"### {section}")
+                line = rest
+                if not line:
+                    continue
+            if number is not None:
+                line = f"{number} {line}"
+                number = None
+            lines.append(heading + line)
+    return "\n\n".join(lines) + "\n" if lines else ""
+
+
+class MarkdownConverterPool:
+    """
+    Runs convert_bill_html in a process pool so CPU-bound conversions don't
+    block the event loop and use more than one core.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("MARKDOWN_PROCESS_WORKERS", "0")) or None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the API and clock processes run threads and an event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(self.shutdown)
+        return self._executor
+
+    async def convert(self, content: bytes) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), convert_bill_html, content)
+
+    async def convert_many(self, documents: Dict[Hashable, bytes]) -> AsyncIterator[Tuple[Hashable, object]]:
+        """
+        Yield (key, markdown) as each document finishes; a failed conversion
+        yields its exception as the result.
+        """
+        async def _run(key: Hashable, content: bytes):
+            try:
+                return key, await self.convert(content)
+            except Exception as e:
+                return key, e
+
+        for task in asyncio.as_completed([_run(key, content) for key, content in documents.items()]):
+            yield await task
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+markdown_pool = MarkdownConverterPool()
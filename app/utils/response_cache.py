@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from app.utils.coalescing import Coalescer
+from app.utils.sqlite_utils import SQLiteConnector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(".cache", "responses.sqlite3")
+
+
+class ResponseCache:
+    """
+    TTL cache for JSON-serializable API responses, stored in SQLite so every
+    uvicorn worker on the host shares it.
+
+    Entries are fresh for `ttl` seconds and may then be served stale for another
+    `stale_ttl` seconds while one caller refreshes them in the background.
+    Identical misses are coalesced: within a worker callers share one future, and
+    across workers a lease row makes sure only one of them recomputes while the
+    others wait for its result.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, lease_seconds: float = 300.0,
+                 poll_interval: float = 0.25):
+        self.db_path = db_path or os.getenv("RESPONSE_CACHE_DB", DEFAULT_DB_PATH)
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._inflight = Coalescer()
+        self._refreshes = set()
+        self._db = SQLiteConnector(self._create_schema, isolation_level=None)
+
+    def _connect(self) -> sqlite3.Connection:
+        return self._db.connect(self.db_path)
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                stored_at REAL,
+                expires_at REAL,
+                stale_until REAL,
+                lease_until REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+
+    def _read(self, key: str) -> Optional[Tuple[Any, float, float, float]]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value, stored_at, expires_at, stale_until FROM responses WHERE key = ? AND value IS NOT NULL",
+                (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2], row[3]
+
+    def _write(self, key: str, value: Any, ttl: float, stale_ttl: float):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                INSERT INTO responses (key, value, stored_at, expires_at, stale_until, lease_until)
+                VALUES (?, ?, ?, ?, ?, 0)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, stored_at = excluded.stored_at,
+                    expires_at = excluded.expires_at, stale_until = excluded.stale_until, lease_until = 0
+                """,
+                (key, json.dumps(value), now, now + ttl, now + ttl + stale_ttl)
+            )
+        finally:
+            conn.close()
+
+    def _try_lease(self, key: str) -> bool:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT lease_until FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[0] > now:
+                    conn.execute("COMMIT")
+                    return False
+                conn.execute(
+                    """
+                    INSERT INTO responses (key, lease_until) VALUES (?, ?)
+                    ON CONFLICT(key) DO UPDATE SET lease_until = excluded.lease_until
+                    """,
+                    (key, now + self.lease_seconds)
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def _release_lease(self, key: str):
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE responses SET lease_until = 0 WHERE key = ?", (key,))
+        finally:
+            conn.close()
+
+    def invalidate(self, prefix: str = "") -> int:
+        """
+        Drop every entry whose key starts with `prefix` (all entries by default).
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM responses WHERE substr(key, 1, ?) = ?",
+                (len(prefix), prefix)
+            )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_ttl: float = 0.0,
+        refresh: bool = False
+    ) -> Tuple[Any, str]:
+        """
+        Return (value, state) where state is "hit", "stale" or "miss". With
+        `refresh`, skip the cached value and recompute.
+        """
+        if not refresh and ttl > 0:
+            try:
+                entry = await asyncio.to_thread(self._read, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache unavailable, computing {key}: {e}")
+                entry = None
+            if entry is not None:
+                value, _, expires_at, stale_until = entry
+                now = time.time()
+                if now < expires_at:
+                    return value, "hit"
+                if now < stale_until:
+                    self._refresh_in_background(key, compute, ttl, stale_ttl)
+                    return value, "stale"
+        return await self._compute_coalesced(key, compute, ttl, stale_ttl), "miss"
+
+    def _refresh_in_background(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: float,
+                               stale_ttl: float):
+        if key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                await self._compute_coalesced(key, compute, ttl, stale_ttl, wait_for_lease=False)
+            except Exception as e:
+                logger.warning(f"Background refresh of {key} failed: {e}")
+
+        task = asyncio.create_task(refresh())
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _compute_coalesced(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: float,
+                                 stale_ttl: float, wait_for_lease: bool = True) -> Any:
+        return await self._inflight.run(
+            key, lambda: self._compute_leased(key, compute, ttl, stale_ttl, wait_for_lease)
+        )
+
+    async def _compute_leased(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: float,
+                              stale_ttl: float, wait_for_lease: bool) -> Any:
+        started = time.time()
+        deadline = time.monotonic() + self.lease_seconds
+        try:
+            while not await asyncio.to_thread(self._try_lease, key):
+                if not wait_for_lease:
+                    # Another worker is already refreshing this entry
+                    entry = await asyncio.to_thread(self._read, key)
+                    return entry[0] if entry else None
+                await asyncio.sleep(self.poll_interval)
+                entry = await asyncio.to_thread(self._read, key)
+                if entry is not None and entry[1] >= started:
+                    return entry[0]
+                if time.monotonic() > deadline:
+                    logger.warning(f"Timed out waiting for another worker to compute {key}, computing it here")
+                    break
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache unavailable, computing {key} without coalescing: {e}")
+            return await compute()
+        try:
+            value = await compute()
+        except BaseException:
+            await asyncio.to_thread(self._release_lease, key)
+            raise
+        try:
+            if ttl > 0:
+                await asyncio.to_thread(self._write, key, value, ttl, stale_ttl)
+            else:
+                await asyncio.to_thread(self._release_lease, key)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not cache {key}: {e}")
+        return value
+
+
+response_cache = ResponseCache()
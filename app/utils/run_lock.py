@@ -0,0 +1,174 @@
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Literal, Optional
+
+from app.utils.coalescing import settle_future
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_DIR = os.path.join(".cache", "locks")
+
+
+@dataclass
+class SingleFlightResult:
+    # "ran": this call did the work; "joined": another caller's run finished while we waited;
+    # "skipped": a run was already in progress and we didn't wait for it
+    status: Literal["ran", "joined", "skipped"]
+    result: Any = None
+
+
+class _FileLock:
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class _AdvisoryLock:
+    """
+    Postgres session-level advisory lock, held on a dedicated connection for the
+    duration of the run. Works across dynos, unlike the file lock.
+    """
+
+    def __init__(self, database_url: str, name: str):
+        self.database_url = database_url
+        self.key = int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+        self._conn = None
+
+    def try_acquire(self) -> bool:
+        import psycopg2
+
+        conn = psycopg2.connect(self.database_url, connect_timeout=10)
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (self.key,))
+            acquired = cursor.fetchone()[0]
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                with self._conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (self.key,))
+            finally:
+                self._conn.close()
+                self._conn = None
+
+
+class SingleFlight:
+    """
+    Makes sure only one run of a job is in flight at a time, across coroutines,
+    uvicorn workers and the clock process.
+
+    Within a process, concurrent callers join the run already in progress and get
+    its result. Across processes the run is guarded by a Postgres advisory lock
+    when DATABASE_URL is set (falling back to a local file lock if the database
+    can't be reached); a caller that finds the lock held either waits for that run
+    to finish ("joined") or returns immediately ("skipped").
+    """
+
+    def __init__(self, name: str, lock_dir: Optional[str] = None, poll_interval: float = 2.0,
+                 join_timeout: float = 900.0):
+        self.name = name
+        self.lock_dir = lock_dir or os.getenv("RUN_LOCK_DIR", DEFAULT_LOCK_DIR)
+        self.poll_interval = poll_interval
+        self.join_timeout = join_timeout
+        self._current: Optional[asyncio.Future] = None
+        self._guard: Optional[asyncio.Lock] = None
+        self._guard_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _make_lock(self):
+        database_url = os.getenv("DATABASE_URL")
+        if database_url:
+            return _AdvisoryLock(database_url, self.name)
+        return _FileLock(os.path.join(self.lock_dir, f"{self.name}.lock"))
+
+    async def _try_acquire(self):
+        lock = self._make_lock()
+        try:
+            acquired = await asyncio.to_thread(lock.try_acquire)
+        except Exception as e:
+            if isinstance(lock, _FileLock):
+                raise
+            logger.warning(f"Advisory lock for {self.name} unavailable, using local file lock: {e}")
+            lock = _FileLock(os.path.join(self.lock_dir, f"{self.name}.lock"))
+            acquired = await asyncio.to_thread(lock.try_acquire)
+        return lock if acquired else None
+
+    @property
+    def in_flight(self) -> bool:
+        return self._current is not None and not self._current.done()
+
+    def _get_guard(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._guard_loop is not loop:
+            self._guard = asyncio.Lock()
+            self._guard_loop = loop
+        return self._guard
+
+    async def run(self, job: Callable[[], Awaitable[Any]], join: bool = True) -> SingleFlightResult:
+        # Serialize the check-and-acquire step so two local callers can't both try to take the lock
+        async with self._get_guard():
+            current = self._current if self.in_flight else None
+            lock = None
+            if current is None:
+                lock = await self._try_acquire()
+                if lock is not None:
+                    current = self._current = asyncio.get_running_loop().create_future()
+
+        if lock is None and current is not None:
+            if not join:
+                logger.info(f"{self.name} already running in this process, skipping")
+                return SingleFlightResult(status="skipped")
+            logger.info(f"{self.name} already running in this process, joining it")
+            return SingleFlightResult(status="joined", result=await asyncio.shield(current))
+
+        if lock is None:
+            if not join:
+                logger.info(f"{self.name} already running in another process, skipping")
+                return SingleFlightResult(status="skipped")
+            logger.info(f"{self.name} already running in another process, waiting for it to finish")
+            await self._wait_for_release()
+            return SingleFlightResult(status="joined")
+
+        try:
+            return SingleFlightResult(status="ran", result=await settle_future(current, job()))
+        finally:
+            await asyncio.to_thread(lock.release)
+
+    async def _wait_for_release(self):
+        deadline = time.monotonic() + self.join_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            lock = await self._try_acquire()
+            if lock is not None:
+                await asyncio.to_thread(lock.release)
+                return
+        raise TimeoutError(f"Timed out after {self.join_timeout}s waiting for {self.name} to finish")
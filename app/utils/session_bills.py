@@ -0,0 +1,63 @@
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from app.utils.coalescing import Coalescer
+
+logger = logging.getLogger(__name__)
+
+
+class SessionBillsSnapshot:
+    """
+    In-memory set of every bill number Upvote has for a (state_code, session_id),
+    loaded by paging through the session's bill list once. Existence checks
+    against it are a set lookup instead of an API round trip.
+
+    A snapshot is reused for `ttl_seconds` after it was loaded. Concurrent
+    loads of the same session share one fetch, and bills submitted in the
+    meantime are added so the snapshot doesn't go stale under its own writes.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("SESSION_SNAPSHOT_TTL", "300"))
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: Dict[Tuple[str, int], Tuple[Set[str], float]] = {}
+        self._inflight = Coalescer()
+
+    async def get(self, state_code: str, session_id: int,
+                  load: Callable[[], Awaitable[Iterable[str]]]) -> Set[str]:
+        key = (state_code, int(session_id))
+        cached = self._snapshots.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl_seconds:
+            return cached[0]
+
+        async def load_snapshot() -> Set[str]:
+            started = time.monotonic()
+            bill_numbers = set(await load())
+            self._snapshots[key] = (bill_numbers, started)
+            logger.info(
+                f"Loaded {len(bill_numbers)} bills for {state_code} session {session_id} "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+            return bill_numbers
+
+        return await self._inflight.run(key, load_snapshot)
+
+    def add(self, state_code: str, session_id: int, bill_numbers: Iterable[str]):
+        cached = self._snapshots.get((state_code, int(session_id)))
+        if cached is not None:
+            cached[0].update(bill_numbers)
+
+    def invalidate(self, state_code: Optional[str] = None, session_id: Optional[int] = None):
+        """
+        Drop the snapshot for one session, or every snapshot, so the next check reloads it
+        """
+        if state_code is None:
+            self._snapshots.clear()
+            return
+        self._snapshots.pop((state_code, int(session_id)), None)
+
+
+session_bills = SessionBillsSnapshot()
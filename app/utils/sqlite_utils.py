@@ -0,0 +1,30 @@
+import os
+import sqlite3
+from typing import Callable, Optional
+
+
+class SQLiteConnector:
+    """
+    Opens connections to a local SQLite database file. The first time a path is
+    opened, its directory is created, WAL journaling is enabled and
+    `create_schema` runs; later connections to the same path skip all three.
+    Extra keyword arguments are passed to sqlite3.connect.
+    """
+
+    def __init__(self, create_schema: Callable[[sqlite3.Connection], None], **connect_kwargs):
+        self.create_schema = create_schema
+        self.connect_kwargs = {"timeout": 30, **connect_kwargs}
+        self._initialized_path: Optional[str] = None
+
+    def connect(self, path: str) -> sqlite3.Connection:
+        initialize = self._initialized_path != path
+        if initialize:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, **self.connect_kwargs)
+        if initialize:
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.create_schema(conn)
+            self._initialized_path = path
+        return conn
@@ -1,6 +1,21 @@
 import asyncio
-from apscheduler.schedulers.blocking import BlockingScheduler
+import signal
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.config import (
+    ADAPTIVE_POLLING,
+    BILL_PROCESSING_WINDOWS,
+    POLL_BURST_WINDOW_MINUTES,
+    POLL_MAX_INTERVAL_MINUTES,
+    POLL_MIN_INTERVAL_MINUTES,
+    SCHEDULE_TIMEZONE
+)
 from app.services.bill_service import BillService
+from app.utils.adaptive_polling import AdaptivePoller
+from app.utils.http_client import http_clients
 import logging
 from pytz import timezone
 import sys
@@ -14,85 +29,125 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-scheduler = BlockingScheduler()
+# One instance per job at a time; a backlog of missed fires collapses into a single run
+scheduler = AsyncIOScheduler(job_defaults={
+    "max_instances": 1,
+    "coalesce": True,
+    "misfire_grace_time": 120
+})
+
+
+@dataclass
+class JobState:
+    runs: int = 0
+    last_started: Optional[datetime] = None
+    last_finished: Optional[datetime] = None
+    last_duration: Optional[float] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+job_state = JobState()
+
+poller = AdaptivePoller(
+    windows=BILL_PROCESSING_WINDOWS,
+    tz_name=SCHEDULE_TIMEZONE,
+    min_interval=timedelta(minutes=POLL_MIN_INTERVAL_MINUTES),
+    max_interval=timedelta(minutes=POLL_MAX_INTERVAL_MINUTES),
+    burst_window=timedelta(minutes=POLL_BURST_WINDOW_MINUTES)
+)
+
+
+def schedule_next_poll(run_date: Optional[datetime]):
+    if run_date is None:
+        logger.error("No upcoming polling window, adaptive polling stopped")
+        return
+    scheduler.add_job(process_bills, 'date', run_date=run_date, id="process_bills", replace_existing=True)
+    logger.info(f"Next adaptive poll at {run_date}")
+
+
+def get_job_state() -> dict:
+    """
+    In-process state of the bill processing job, including the next scheduled run.
+    """
+    next_runs = [job.next_run_time for job in scheduler.get_jobs() if job.next_run_time]
+    return {**asdict(job_state), "next_run": min(next_runs) if next_runs else None}
+
 
 async def process_bills():
+    started = time.monotonic()
+    job_state.runs += 1
+    job_state.last_started = datetime.now(timezone(SCHEDULE_TIMEZONE))
     try:
         logger.info("Starting scheduled bill processing")
-        await BillService.process_new_bills()
-        logger.info("Completed scheduled bill processing")
+        # Every enabled state in parallel; a state never overlaps its own run in progress
+        # in this or another process, and one state failing doesn't stop the others
+        outcomes = await BillService.process_states(join=False)
+        statuses = {
+            state_code: "failed" if isinstance(outcome, Exception) else outcome.status
+            for state_code, outcome in outcomes.items()
+        }
+        errors = [f"{state_code}: {outcome}" for state_code, outcome in outcomes.items() if isinstance(outcome, Exception)]
+        distinct = set(statuses.values())
+        job_state.last_status = distinct.pop() if len(distinct) == 1 else ", ".join(
+            f"{state_code} {status}" for state_code, status in statuses.items()
+        )
+        job_state.last_error = "; ".join(errors) or None
+        ran = [outcome.result for outcome in outcomes.values()
+               if not isinstance(outcome, Exception) and outcome.status == "ran" and outcome.result is not None]
+        if ADAPTIVE_POLLING and ran:
+            poller.record(job_state.last_started, any(summary.billpacket_changed for summary in ran))
+        for state_code, status in statuses.items():
+            if status == "skipped":
+                logger.info(f"Skipped scheduled bill processing for {state_code}, a run is already in progress")
+        logger.info(f"Completed scheduled bill processing: {statuses}")
     except Exception as e:
+        job_state.last_status = "failed"
+        job_state.last_error = str(e)
         logger.error(f"Error in scheduled bill processing: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
+    finally:
+        job_state.last_duration = time.monotonic() - started
+        job_state.last_finished = datetime.now(timezone(SCHEDULE_TIMEZONE))
+        if ADAPTIVE_POLLING:
+            schedule_next_poll(poller.next_poll_time(job_state.last_finished))
+        state = get_job_state()
+        logger.info(
+            f"Job state: run #{state['runs']} {state['last_status']} in {state['last_duration']:.1f}s, "
+            f"next run at {state['next_run']}"
+        )
 
-def run_process_bills():
-    try:
-        logger.info("Initiating process_bills run")
-        asyncio.run(process_bills())
-        logger.info("Completed process_bills run")
-    except Exception as e:
-        logger.error(f"Error in run_process_bills: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
 
-def start():
-    try:
-        logger.info("Starting scheduler")
-        central = timezone('US/Central')
-        
-        # Morning window part 1 (7:30 AM - 7:59 AM)
-        scheduler.add_job(
-            run_process_bills,
-            'cron',
-            day_of_week='mon-thu',
-            hour='7',
-            minute='30-59/10',
-            timezone=central
-        )
-        
-        # Morning window part 2 (8:00 AM - 11:00 AM)
-        scheduler.add_job(
-            run_process_bills,
-            'cron',
-            day_of_week='mon-thu',
-            hour='8-10',
-            minute='*/10',
-            timezone=central
-        )
-        
-        # Early afternoon window (12:00 PM - 3:00 PM)
-        scheduler.add_job(
-            run_process_bills,
-            'cron',
-            day_of_week='mon-thu',
-            hour='12-14',
-            minute='*/10',
-            timezone=central
-        )
-        
-        # Late afternoon window (4:00 PM - 6:00 PM)
-        scheduler.add_job(
-            run_process_bills,
-            'cron',
-            day_of_week='mon-thu',
-            hour='16-18',
-            minute='*/10',
-            timezone=central
-        )
+async def start():
+    logger.info("Starting scheduler")
+    schedule_tz = timezone(SCHEDULE_TIMEZONE)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
 
-        logger.info("All jobs scheduled, starting scheduler...")
+    # HTTP pools (and the in-process caches behind them) stay warm across ticks
+    async with http_clients.lifespan():
+        if ADAPTIVE_POLLING:
+            now = datetime.now(schedule_tz)
+            schedule_next_poll(now if poller.in_window(now) else poller.next_window_start(now))
+            logger.info("Adaptive polling scheduled, starting scheduler...")
+        else:
+            for window in BILL_PROCESSING_WINDOWS:
+                scheduler.add_job(process_bills, 'cron', timezone=schedule_tz, **window)
+            logger.info(f"All {len(BILL_PROCESSING_WINDOWS)} jobs scheduled, starting scheduler...")
         scheduler.start()
-    except (KeyboardInterrupt, SystemExit):
-        logger.info("Scheduler shutting down...")
-    except Exception as e:
-        logger.error(f"Fatal error in scheduler: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        raise
+        try:
+            await stop.wait()
+        finally:
+            logger.info("Scheduler shutting down...")
+            scheduler.shutdown(wait=False)
 
 if __name__ == '__main__':
     try:
         logger.info("Initializing clock process")
-        start()
+        asyncio.run(start())
     except Exception as e:
         logger.error(f"Fatal error in clock process: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
@@ -1,8 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import billbook
+from app.database.async_session import dispose_async_engine
+from app.utils.http_client import http_clients
 
-app = FastAPI(title="Bill Scraper API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP session per upstream host for the lifetime of the worker
+    async with http_clients.lifespan():
+        try:
+            yield
+        finally:
+            # The database pool is created on first use and closed with the worker
+            await dispose_async_engine()
+
+
+app = FastAPI(title="Bill Scraper API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
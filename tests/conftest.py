@@ -0,0 +1,44 @@
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services import bill_service
+from app.services.bill_service import BillService
+from app.utils.http_client import http_clients
+
+
+@pytest.fixture
+def upvote_env(monkeypatch, tmp_path):
+    """
+    Upvote credentials for BillService, a throwaway known-bills index and fresh
+    batch-check state. Point UPVOTE_API_BASE_URL at a stub with `upvote_stub`.
+    """
+    for name in ("UPVOTE_API_KEY", "UPVOTE_UID", "ACCESS_TOKEN", "CLIENT"):
+        monkeypatch.setenv(name, "test")
+    monkeypatch.setattr(bill_service.known_bills, "db_path", str(tmp_path / "known_bills.sqlite3"))
+    monkeypatch.setattr(BillService, "_batch_check_unavailable_until", 0.0)
+    return monkeypatch
+
+
+@pytest_asyncio.fixture
+async def upvote_stub(upvote_env):
+    """
+    Start an Upvote stub app (from app.scripts.upvote_stub_server.create_app) and
+    point UPVOTE_API_BASE_URL and BILL_FORMATTER_API_BASE_URL at it.
+    """
+    servers = []
+
+    async def start(app: web.Application) -> str:
+        server = TestServer(app)
+        await server.start_server()
+        servers.append(server)
+        base_url = str(server.make_url("")).rstrip("/")
+        upvote_env.setenv("UPVOTE_API_BASE_URL", base_url)
+        upvote_env.setenv("BILL_FORMATTER_API_BASE_URL", base_url)
+        return base_url
+
+    yield start
+    await http_clients.close()
+    for server in servers:
+        await server.close()
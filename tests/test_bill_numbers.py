@@ -0,0 +1,95 @@
+import pytest
+
+from app.utils.bill_numbers import (
+    BillNumber,
+    BillRange,
+    bill_prefix,
+    bill_sort_key,
+    compress_bill_numbers,
+    format_bill_ranges,
+    normalize_bill_number,
+    parse_bill_number,
+    parse_bill_ranges
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("HF207", "HF207"),
+    ("HF 207", "HF207"),
+    ("H.F. 207", "HF207"),
+    ("hf207", "HF207"),
+    (" ssb 1040 ", "SSB1040"),
+    ("HJR 3", "HJR3"),
+    ("HF0007", "HF7"),
+])
+def test_normalize_bill_number(text, expected):
+    assert normalize_bill_number(text) == expected
+
+
+def test_normalize_keeps_unparseable_text_without_whitespace():
+    assert normalize_bill_number("not a bill") == "notabill"
+    assert normalize_bill_number("207") == "207"
+
+
+def test_parse_bill_number():
+    assert parse_bill_number("SSB 1040") == BillNumber("S", "SB", 1040)
+    assert parse_bill_number("SSB 1040").prefix == "SSB"
+    with pytest.raises(ValueError):
+        parse_bill_number("HF")
+
+
+def test_prefix_and_natural_order():
+    assert bill_prefix("hsb 10") == "HSB"
+    assert bill_prefix("???") == ""
+    bills = ["SF2", "HF10", "junk", "HF2", "HSB1", "HF1"]
+    assert sorted(bills, key=bill_sort_key) == ["HF1", "HF2", "HF10", "HSB1", "SF2", "junk"]
+
+
+def test_compress_bill_numbers():
+    ranges = compress_bill_numbers(["HF3", "HF1", "HF2", "HF5", "SF2", "HF2", BillNumber("H", "F", 6)])
+    assert ranges == [BillRange("HF", 1, 3), BillRange("HF", 5, 6), BillRange("SF", 2, 2)]
+    assert compress_bill_numbers([]) == []
+    with pytest.raises(ValueError):
+        compress_bill_numbers(["HF1", "junk"])
+
+
+def test_format_bill_ranges():
+    assert format_bill_ranges(["HF1", "HF2", "HF3", "HF5", "SF2"]) == "HF1-HF3, HF5, SF2"
+    assert format_bill_ranges(["HF10", "HF9", "junk"]) == "HF9-HF10, junk"
+    assert format_bill_ranges([]) == ""
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("HF1-HF250", [BillRange("HF", 1, 250)]),
+    ("HF1-250", [BillRange("HF", 1, 250)]),
+    ("hf 1 - hf 3, sf2", [BillRange("HF", 1, 3), BillRange("SF", 2, 2)]),
+    ("HF1–HF3", [BillRange("HF", 1, 3)]),
+    ("HF5-HF5", [BillRange("HF", 5, 5)]),
+    (" HF1 ,, SSB2 ", [BillRange("HF", 1, 1), BillRange("SSB", 2, 2)]),
+    ("", []),
+])
+def test_parse_bill_ranges(text, expected):
+    assert parse_bill_ranges(text) == expected
+
+
+@pytest.mark.parametrize("text, message", [
+    ("HF1-SF3", "different bill types"),
+    ("HF1-HSB3", "different bill types"),
+    ("HF10-HF2", "ends before it starts"),
+    ("HF1-", "Not a bill number"),
+    ("HF1,junk", "Not a bill number"),
+    ("-HF3", "Not a bill number"),
+    ("HF1-HF2-HF3", "Not a bill number"),
+])
+def test_parse_bill_ranges_rejects_bad_input(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_bill_ranges(text)
+
+
+def test_ranges_round_trip():
+    bills = ["HF1", "HF2", "HF3", "HF7", "SF10", "SF11", "HSB4"]
+    ranges = parse_bill_ranges(format_bill_ranges(bills))
+    assert ranges == compress_bill_numbers(bills)
+    assert sorted(str(b) for r in ranges for b in r) == sorted(bills)
+    assert "HF2" in ranges[0] and "HF4" not in ranges[0] and "SF2" not in ranges[0]
+    assert len(ranges[0]) == 3
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from app.utils import billpacket_parser
+from app.utils.billpacket_parser import parse_billpacket, parse_billpacket_soup
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "billpacket.html")
+
+
+@pytest.fixture(scope="module")
+def billpacket_page() -> str:
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def reference_rows(billpacket_page):
+    # The original full-page html.parser walk
+    return parse_billpacket_soup(billpacket_page, restrict=False)
+
+
+def test_fixture_rows(reference_rows):
+    assert [row.bill_number for row in reference_rows] == [
+        "HF1", "HF2", "HF10", "SF101", "HJR3", "SF102", "HSB1", "SSB1001"
+    ]
+    assert reference_rows[2].bill_title == "A bill for an act concerning chapter 321 & motor vehicle registration fees."
+    assert reference_rows[0].state_link == "https://www.legis.iowa.gov/legislation/BillBook?ba=HF1&ga=91"
+
+
+def test_restricted_soup_matches_full_parse(billpacket_page, reference_rows):
+    assert parse_billpacket_soup(billpacket_page) == reference_rows
+
+
+@pytest.mark.skipif(billpacket_parser.lxml is None, reason="lxml is not installed")
+def test_lxml_matches_full_parse(billpacket_page, reference_rows):
+    assert billpacket_parser.parse_billpacket_lxml(billpacket_page) == reference_rows
+
+
+def test_default_parser_matches_full_parse(billpacket_page, reference_rows):
+    assert parse_billpacket(billpacket_page) == reference_rows
+
+
+def test_custom_state_link_template(billpacket_page):
+    template = "https://example.test/{bill_number}"
+    links = {row.state_link for row in parse_billpacket(billpacket_page, template)}
+    assert "https://example.test/HSB1" in links
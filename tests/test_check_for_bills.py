@@ -0,0 +1,95 @@
+import pytest
+from aiohttp import web
+
+from app.scripts.upvote_stub_server import create_app
+from app.services import bill_service
+from app.services.bill_service import BillService
+
+EXISTING = ["HF1", "HF3", "HF5"]
+BILLS = [f"HF{i}" for i in range(1, 11)]
+
+
+@pytest.fixture
+def batch_mode(monkeypatch):
+    monkeypatch.setattr(bill_service, "CHECK_BATCH_MODE", True)
+
+
+async def check(bills=BILLS):
+    return sorted(await BillService.check_for_bills(bills, 937, "IA", chunk_size=4, max_in_flight=1))
+
+
+@pytest.mark.asyncio
+async def test_per_bill_checks_by_default(upvote_stub):
+    stub = create_app(EXISTING)
+    await upvote_stub(stub)
+    assert await check() == sorted(set(BILLS) - set(EXISTING))
+    assert stub["stats"]["exists"] == 0
+    assert stub["stats"]["filter"] == len(BILLS)
+
+
+@pytest.mark.asyncio
+async def test_batch_check(upvote_stub, batch_mode):
+    stub = create_app(EXISTING)
+    await upvote_stub(stub)
+    assert await check() == sorted(set(BILLS) - set(EXISTING))
+    assert stub["stats"]["exists"] == 3
+    assert stub["stats"]["filter"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_404_falls_back_to_per_bill_checks(upvote_stub, batch_mode):
+    stub = create_app(EXISTING, batch_enabled=False)
+    await upvote_stub(stub)
+    assert await check() == sorted(set(BILLS) - set(EXISTING))
+    assert stub["stats"]["filter"] == len(BILLS)
+    assert not BillService.batch_check_available()
+
+
+@pytest.mark.parametrize("response", [
+    lambda: web.Response(status=401),
+    lambda: web.Response(status=400),
+    lambda: web.Response(text="<html>Sign in</html>", content_type="text/html"),
+    lambda: web.json_response({"unexpected": []}),
+    lambda: web.json_response({"existing_bill_numbers": "HF1"}),
+], ids=["401", "400", "html", "missing-key", "wrong-shape"])
+@pytest.mark.asyncio
+async def test_bad_batch_response_falls_back_once(upvote_stub, batch_mode, response):
+    stub = create_app(EXISTING, batch_enabled=False)
+    calls = []
+
+    async def bills_exist(request):
+        calls.append(request)
+        return response()
+
+    stub.router.add_post(bill_service.CHECK_BATCH_PATH, bills_exist)
+    await upvote_stub(stub)
+    assert await check() == sorted(set(BILLS) - set(EXISTING))
+    # The first failing chunk turns batching off; later chunks and runs don't retry it
+    assert await check() == sorted(set(BILLS) - set(EXISTING))
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_unavailable_batch_check_is_retried_later(upvote_stub, batch_mode):
+    stub = create_app(EXISTING, batch_enabled=False)
+    statuses = [503]
+
+    async def bills_exist(request):
+        stub["stats"]["exists"] += 1
+        if statuses:
+            return web.Response(status=statuses.pop())
+        body = await request.json()
+        return web.json_response({"existing_bill_numbers": [b for b in body["bill_numbers"] if b in EXISTING]})
+
+    stub.router.add_post(bill_service.CHECK_BATCH_PATH, bills_exist)
+    await upvote_stub(stub)
+    assert await check(BILLS[:5]) == ["HF2", "HF4"]
+    assert stub["stats"]["exists"] == 1
+    assert not BillService.batch_check_available()
+
+    # Once the retry delay has passed, the next run asks the batch endpoint again
+    BillService._batch_check_unavailable_until -= bill_service.CHECK_BATCH_RETRY_SECONDS
+    assert await check(BILLS[5:]) == sorted(BILLS[5:])
+    assert stub["stats"]["exists"] == 3
+    assert stub["stats"]["filter"] == 5
+    assert BillService.batch_check_available()
@@ -0,0 +1,73 @@
+import pytest
+
+from app.schemas.bill_schemas import BillResponse
+from app.scripts.upvote_stub_server import create_app
+from app.services import bill_service
+from app.services.bill_service import BillService
+
+
+@pytest.fixture
+def remote_converter(monkeypatch, tmp_path):
+    monkeypatch.setattr(bill_service, "MARKDOWN_LOCAL_CONVERTER", False)
+    monkeypatch.setattr(bill_service.bill_text_store, "root", str(tmp_path / "bill_text"))
+
+
+def bill(bill_number: str, text: str) -> BillResponse:
+    return BillResponse(
+        bill_number=bill_number,
+        html=f"<html><body><p>{text}</p></body></html>".encode(),
+        state_link=f"https://example.test/{bill_number}"
+    )
+
+
+async def convert(bills):
+    results = [result async for result in BillService.convert_bills_to_markdown(bills, max_in_flight=1)]
+    return {result.bill_number: result for result in results}
+
+
+BILLS = [bill("HF1", "An act relating to roads."), bill("HF2", "An act relating to roads."),
+         bill("HF3", "An act relating to schools.")]
+
+
+@pytest.mark.asyncio
+async def test_same_html_is_converted_once(upvote_stub, remote_converter):
+    stub = create_app()
+    await upvote_stub(stub)
+    results = await convert(BILLS)
+    assert stub["stats"]["convert"] == 2
+    assert results["HF1"].markdown_text == results["HF2"].markdown_text == "An act relating to roads."
+    assert results["HF3"].markdown_text == "An act relating to schools."
+    assert not any(result.error or result.cached for result in results.values())
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(upvote_stub, remote_converter):
+    stub = create_app(convert_fail_every=2)
+    await upvote_stub(stub)
+    results = await convert(BILLS)
+    # The second call fails with a 503 and is retried
+    assert stub["stats"]["convert"] == 3
+    assert all(result.markdown_text and not result.error for result in results.values())
+
+
+@pytest.mark.asyncio
+async def test_persistent_failure_is_reported(upvote_stub, remote_converter, monkeypatch):
+    monkeypatch.setattr(bill_service, "FORMATTER_MAX_RETRIES", 1)
+    stub = create_app(convert_fail_every=1)
+    await upvote_stub(stub)
+    results = await convert(BILLS[:1])
+    assert stub["stats"]["convert"] == 2
+    assert results["HF1"].markdown_text is None
+    assert "503" in results["HF1"].error
+
+
+@pytest.mark.asyncio
+async def test_converted_html_comes_from_the_store(upvote_stub, remote_converter):
+    stub = create_app()
+    await upvote_stub(stub)
+    await convert(BILLS[:1])
+    results = await convert(BILLS + [bill("HF4", "An act relating to parks.")])
+    assert stub["stats"]["convert"] == 3
+    assert results["HF1"].cached and results["HF2"].cached
+    assert results["HF2"].markdown_text == "An act relating to roads."
+    assert not results["HF3"].cached and not results["HF4"].cached
@@ -0,0 +1,79 @@
+import os
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services import bill_service
+from app.services.bill_service import BillService
+from app.states.base import StateAdapter
+from app.utils.bill_cache import BillCache
+
+BODY = b"<html><body>" + b"<p>An act relating to roads.</p>" * 10 + b"</body></html>"
+
+
+class StubAdapter(StateAdapter):
+    state_code = "XX"
+
+    def __init__(self, base_url: str, cache_dir: str):
+        self.base_url = base_url
+        self.cache_dir = cache_dir
+
+    def resolve_session_id(self) -> int:
+        return 1
+
+    def parse_listing(self, content: str):
+        return []
+
+    def attachment_url(self, bill_number: str) -> str:
+        return f"{self.base_url}/att/{bill_number}"
+
+    @property
+    def bill_cache(self) -> BillCache:
+        return BillCache(self.cache_dir)
+
+
+@pytest.fixture
+def text_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(bill_service.bill_text_store, "root", str(tmp_path / "bill_text"))
+    return bill_service.bill_text_store
+
+
+async def fetch_twice(tmp_path, between=None):
+    requests = []
+
+    async def attachment(request):
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(body=BODY, headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/att/{bill}", attachment)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        adapter = StubAdapter(str(server.make_url("")).rstrip("/"), str(tmp_path / "bill_html"))
+        bodies = [await BillService.fetch_bill_html(session, "HF1", adapter)]
+        if between:
+            between()
+        bodies.append(await BillService.fetch_bill_html(session, "HF1", adapter))
+    return bodies, requests
+
+
+@pytest.mark.asyncio
+async def test_not_modified_is_served_from_the_text_store(tmp_path, text_store):
+    bodies, requests = await fetch_twice(tmp_path)
+    assert bodies == [BODY, BODY]
+    assert requests == [None, '"v1"']
+    # The cache keeps validators only; the body is stored once, in the text store
+    assert os.listdir(tmp_path / "bill_html") == ["HF1.json"]
+    assert text_store.read(BillCache(str(tmp_path / "bill_html")).get("HF1").content_hash) == BODY
+
+
+@pytest.mark.asyncio
+async def test_missing_stored_body_is_fetched_again(tmp_path, text_store, monkeypatch):
+    bodies, requests = await fetch_twice(
+        tmp_path, lambda: monkeypatch.setattr(text_store, "root", str(tmp_path / "empty_store"))
+    )
+    assert bodies == [BODY, BODY]
+    assert requests == [None, '"v1"', None]
@@ -0,0 +1,31 @@
+import time
+
+import pytest
+
+from app.services.bill_service import BillService
+from app.states import get_adapter
+from app.utils.billpacket_parser import BillpacketRow
+from app.utils.billpacket_snapshot import BillpacketSnapshot
+
+ROWS = [BillpacketRow("HF1", "Roads", "https://example.test/HF1"),
+        BillpacketRow("SF2", "Schools", "https://example.test/SF2")]
+
+
+@pytest.fixture
+def adapter(monkeypatch, tmp_path):
+    adapter = get_adapter("IA")
+    monkeypatch.setitem(adapter.__dict__, "snapshot", BillpacketSnapshot(str(tmp_path / "snapshot.json")))
+    return adapter
+
+
+def test_since_keeps_rows_first_seen_after_it(adapter):
+    adapter.snapshot.save(ROWS[:1])
+    since = time.time()
+    assert BillService.filter_rows(ROWS, since=since, adapter=adapter) == ROWS[1:]
+    assert BillService.filter_rows(ROWS, since=since - 60, adapter=adapter) == ROWS
+
+
+def test_since_without_snapshot_is_an_error(adapter):
+    with pytest.raises(ValueError, match="snapshot"):
+        BillService.filter_rows(ROWS, since=time.time(), adapter=adapter)
+    assert BillService.filter_rows(ROWS, prefixes=["sf"], adapter=adapter) == ROWS[1:]
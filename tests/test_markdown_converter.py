@@ -0,0 +1,41 @@
+import glob
+import os
+
+import pytest
+
+from app.scripts.compare_markdown_golden import compare, normalize
+from app.utils.markdown_converter import convert_bill_html
+
+# Hand-written fixtures (see fixtures/markdown/README.md): they pin the local
+# converter's output, not its parity with the bill formatter
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "markdown")
+GOLDEN_BILLS = sorted(
+    os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(GOLDEN_DIR, "*.html"))
+)
+
+
+@pytest.mark.parametrize("bill_number", GOLDEN_BILLS)
+def test_matches_golden_markdown(bill_number):
+    with open(os.path.join(GOLDEN_DIR, f"{bill_number}.html"), "rb") as f:
+        html = f.read()
+    with open(os.path.join(GOLDEN_DIR, f"{bill_number}.md"), "r", encoding="utf-8") as f:
+        expected = normalize(f.read())
+    assert normalize(convert_bill_html(html)) == expected
+
+
+def test_compare_script_passes_on_fixtures():
+    assert GOLDEN_BILLS
+    assert compare(GOLDEN_DIR, context=-1) == 0
+
+
+def test_keeps_text_outside_blocks():
+    assert convert_bill_html(b"<body>Section 1. Text<br>more</body>") == "### Section 1.\n\nText\n\nmore\n"
+
+
+def test_keeps_loose_text_between_paragraphs():
+    markdown = convert_bill_html(b"<div>Intro <b>bold</b><p>One</p>tail<p>Two</p></div>")
+    assert markdown == "Intro **bold**\n\nOne\n\ntail\n\nTwo\n"
+
+
+def test_source_newlines_do_not_split_lines():
+    assert convert_bill_html(b"<p>old <u>new\nwords</u> end</p>") == "old <u>new words</u> end\n"
@@ -0,0 +1,61 @@
+import aiohttp
+import pytest
+from aiohttp.test_utils import TestServer
+
+from app.scripts.upvote_stub_server import create_app
+from app.services.bill_service import BillService
+
+BILLS = [f"HF{i}" for i in range(1, 51)]
+
+
+async def fetch_session_bills(page_size: int = 7, **stub_options):
+    stub = create_app(BILLS, **stub_options)
+    async with TestServer(stub) as server, aiohttp.ClientSession() as session:
+        base_url = str(server.make_url("")).rstrip("/")
+        pages = [
+            page async for page in BillService.iter_session_bill_pages(session, "IA", 937, base_url, {}, page_size)
+        ]
+    return pages, stub["stats"]
+
+
+@pytest.mark.asyncio
+async def test_pages_until_count_reached():
+    pages, stats = await fetch_session_bills()
+    assert sorted(b for page in pages for b in page) == sorted(BILLS)
+    assert stats["filter"] == 8
+
+
+@pytest.mark.asyncio
+async def test_pages_until_short_page_without_count():
+    pages, stats = await fetch_session_bills(report_count=False)
+    assert sorted(b for page in pages for b in page) == sorted(BILLS)
+    assert stats["filter"] == 8
+
+
+@pytest.mark.asyncio
+async def test_page_size_dividing_total_without_count():
+    # The last full page is followed by an empty one
+    pages, stats = await fetch_session_bills(page_size=10, report_count=False)
+    assert len({b for page in pages for b in page}) == 50
+    assert stats["filter"] == 6
+
+
+@pytest.mark.asyncio
+async def test_ignored_paging_with_count_raises():
+    # The same rows on every page must not add up to the reported count
+    with pytest.raises(RuntimeError, match="stopped growing on page 2 after 7 of 50"):
+        await fetch_session_bills(ignore_paging=True)
+
+
+@pytest.mark.asyncio
+async def test_ignored_paging_without_count_raises():
+    with pytest.raises(RuntimeError, match="stopped growing on page 2 after 7 bills"):
+        await fetch_session_bills(ignore_paging=True, report_count=False)
+
+
+@pytest.mark.asyncio
+async def test_unpaged_response_is_complete():
+    # An API that ignores paging but returns everything at once is still complete
+    pages, stats = await fetch_session_bills(page_size=100, ignore_paging=True)
+    assert [len(page) for page in pages] == [50]
+    assert stats["filter"] == 1